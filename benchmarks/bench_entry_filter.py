@@ -0,0 +1,75 @@
+"""Micro-benchmark for agent filtering.
+
+Compares rebuilding the filter from config for every entry x agent (the old
+``filter_entry`` behaviour) with one compiled ``FilterPlan`` classifying whole
+pages. Run from the repository root: ``python benchmarks/bench_entry_filter.py``.
+"""
+import argparse
+import importlib.util
+import random
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+ENTRY_FILTER_PATH = PROJECT_ROOT / 'core' / 'entry_filter.py'
+
+spec = importlib.util.spec_from_file_location('core.entry_filter', ENTRY_FILTER_PATH)
+entry_filter = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(entry_filter)
+
+AGENTS = {
+    'summary': {
+        'title': 'AI summary:',
+        'style_block': True,
+        'deny_list': ['https://ai-news.miniflux', 'https://*.example.org/*', 'https://blocked-*.com/*'],
+    },
+    'translate': {
+        'title': 'AI translate:',
+        'style_block': False,
+        'auto_translate_non_chinese': True,
+        'allow_list': [f'https://site{n}.com/*' for n in range(20)],
+    },
+}
+
+
+def make_entries(count, feeds):
+    paragraph = '<p>' + 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 40 + '</p>'
+    chinese = '<p>' + '这是一个用于测试的中文段落。' * 80 + '</p>'
+    return [
+        {
+            'id': n,
+            'title': f'Entry {n}',
+            'content': (chinese if n % 3 == 0 else paragraph) * 5,
+            'feed': {'site_url': f'https://site{n % feeds}.com/feed'},
+        }
+        for n in range(count)
+    ]
+
+
+def rebuild_per_call(entries):
+    for entry in entries:
+        for name in AGENTS:
+            entry_filter.FilterPlan(AGENTS).allows(name, entry)
+
+
+def compiled_plan(entries):
+    entry_filter.FilterPlan(AGENTS).classify(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=2000)
+    parser.add_argument('--feeds', type=int, default=50)
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries, args.feeds)
+    random.shuffle(entries)
+    for name, func in (('rebuild per call', rebuild_per_call), ('compiled plan', compiled_plan)):
+        started = time.perf_counter()
+        func(entries)
+        elapsed = time.perf_counter() - started
+        print(f'{name:<18} {elapsed * 1e6 / len(entries):8.1f} us/entry')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Local stand-ins for an OpenAI-compatible LLM and the Miniflux API.
+
+Both servers run in background threads on ephemeral ports and keep simple
+counters so benchmarks can report calls per entry and write-back timings.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ENGLISH_PARAGRAPH = (
+    'The committee published its annual report on Tuesday, outlining new measures to improve '
+    'infrastructure resilience and reduce energy costs across the region. '
+)
+CHINESE_PARAGRAPH = '委员会周二发布年度报告，提出了提升基础设施韧性和降低区域能源成本的新措施。'
+
+
+def make_entries(count, cjk_ratio=0.3, feeds=20, paragraphs=12, start_id=1, seed=42):
+    """Synthetic unread entries spread over ``feeds`` feeds with the requested language mix."""
+    rng = random.Random(seed + start_id)
+    entries = []
+    for offset in range(count):
+        entry_id = start_id + offset
+        feed_id = entry_id % feeds + 1
+        chinese = rng.random() < cjk_ratio
+        paragraph = CHINESE_PARAGRAPH if chinese else ENGLISH_PARAGRAPH
+        body = ''.join(f'<p>{paragraph * rng.randint(1, 4)}</p>' for _ in range(paragraphs))
+        entries.append({
+            'id': entry_id,
+            'title': f'{"新闻" if chinese else "News"} {entry_id}',
+            'content': f'<article>{body}<script>track({entry_id})</script></article>',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'published_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - rng.randint(0, 86400))),
+            'status': 'unread',
+            'feed': {
+                'id': feed_id,
+                'title': f'Feed {feed_id}',
+                'site_url': f'https://feed{feed_id}.example.com/',
+                'category': {'id': feed_id % 4 + 1, 'title': f'Category {feed_id % 4 + 1}'},
+            },
+        })
+    return entries
+
+
+class _Server:
+    handler_class = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        handler = type('Handler', (self.handler_class,), {'server_state': self})
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    server_state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _LLMHandler(_JSONHandler):
+    def do_POST(self):
+        state = self.server_state
+        request = self._read_json()
+        with state.lock:
+            state.calls += 1
+            roll = state.rng.random()
+            latency = max(0.0, state.rng.gauss(state.latency, state.latency_jitter))
+
+        if roll < state.rate_limit_rate:
+            with state.lock:
+                state.rate_limited += 1
+            self._send_json(429, {'error': {'message': 'Rate limit reached'}}, {'Retry-After': '1'})
+            return
+        if roll < state.rate_limit_rate + state.error_rate:
+            with state.lock:
+                state.errors += 1
+            self._send_json(500, {'error': {'message': 'Mock failure'}})
+            return
+
+        time.sleep(latency)
+        prompt = request['messages'][-1]['content']
+        answer = f'Mock answer ({len(prompt)} chars of input). ' * 3
+        if request.get('stream'):
+            self._stream(request['model'], answer)
+            return
+        self._send_json(200, {
+            'id': 'chatcmpl-mock',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(answer) // 4,
+                      'total_tokens': (len(prompt) + len(answer)) // 4},
+        })
+
+    def _stream(self, model, answer):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for word in answer.split(' '):
+            chunk = {
+                'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}],
+            }
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b'data: [DONE]\n\n')
+
+
+class MockLLMServer(_Server):
+    """OpenAI-compatible ``/v1/chat/completions`` with configurable latency, errors and 429s."""
+
+    handler_class = _LLMHandler
+
+    def __init__(self, latency=0.2, latency_jitter=0.05, error_rate=0.0, rate_limit_rate=0.0, seed=7):
+        super().__init__()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+
+class _MinifluxHandler(_JSONHandler):
+    def do_GET(self):
+        state = self.server_state
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/v1/me':
+            self._send_json(200, {'id': 1, 'username': 'benchmark'})
+        elif url.path == '/v1/entries':
+            self._send_json(200, state.query_entries(query))
+        elif url.path == '/v1/feeds':
+            self._send_json(200, state.feeds())
+        elif url.path == '/v1/feeds/counters':
+            self._send_json(200, state.counters())
+        else:
+            self._send_json(404, {'error_message': 'Not found'})
+
+    def do_PUT(self):
+        state = self.server_state
+        match = re.fullmatch(r'/v1/entries/(\d+)', self.path)
+        if match:
+            payload = self._read_json()
+            entry = state.update_entry(int(match.group(1)), payload.get('content'))
+            self._send_json(201 if entry else 404, entry or {'error_message': 'Not found'})
+        elif re.fullmatch(r'/v1/feeds/\d+/refresh', self.path):
+            self._send_json(204, {})
+        else:
+            self._send_json(404, {'error_message': 'Not found'})
+
+    def do_POST(self):
+        if self.path == '/v1/feeds':
+            self._send_json(201, {'feed_id': 999})
+        else:
+            self._send_json(404, {'error_message': 'Not found'})
+
+
+class MockMinifluxServer(_Server):
+    """Enough of the Miniflux v1 API for the poller, webhook and digest paths."""
+
+    handler_class = _MinifluxHandler
+
+    def __init__(self, entries=()):
+        super().__init__()
+        self.entries = {}
+        self.updated_at = {}
+        self.add_entries(entries)
+
+    def add_entries(self, entries):
+        with self.lock:
+            for entry in entries:
+                self.entries[entry['id']] = dict(entry)
+
+    def query_entries(self, query):
+        limit = int(query.get('limit', ['100'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        after = int(query.get('after_entry_id', ['0'])[0])
+        statuses = set(query.get('status', []))
+        descending = query.get('direction', ['asc'])[0] == 'desc'
+        with self.lock:
+            matching = [
+                entry for entry_id, entry in sorted(self.entries.items(), reverse=descending)
+                if entry_id > after and (not statuses or entry['status'] in statuses)
+            ]
+        return {'total': len(matching), 'entries': matching[offset:offset + limit]}
+
+    def update_entry(self, entry_id, content):
+        with self.lock:
+            entry = self.entries.get(entry_id)
+            if entry is None:
+                return None
+            entry['content'] = content
+            self.updated_at[entry_id] = time.time()
+            return dict(entry)
+
+    def feeds(self):
+        with self.lock:
+            feeds = {entry['feed']['id']: entry['feed'] for entry in self.entries.values()}
+        return list(feeds.values()) + [{'id': 999, 'title': '֎Newsᴬᴵ for you', 'site_url': 'https://ai-news.miniflux'}]
+
+    def counters(self):
+        with self.lock:
+            unreads = {}
+            for entry in self.entries.values():
+                if entry['status'] == 'unread':
+                    feed_id = str(entry['feed']['id'])
+                    unreads[feed_id] = unreads.get(feed_id, 0) + 1
+        return {'reads': {}, 'unreads': unreads}
@@ -0,0 +1,235 @@
+"""End-to-end throughput benchmark for the poller, webhook and daily digest paths.
+
+Starts the mock LLM and Miniflux servers from ``mock_servers``, writes a
+throw-away config.yml pointing at them, and drives the real pipeline in
+process. Example, from the repository root::
+
+    python benchmarks/run_pipeline.py --entries 500 --llm-latency 0.3 --error-rate 0.02
+
+Requires the application dependencies from requirements.txt.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import yaml
+
+from mock_servers import MockLLMServer, MockMinifluxServer, make_entries
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _wait_until(predicate, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _write_config(path, args, llm, miniflux, storage_dir):
+    config = {
+        'log_level': args.log_level,
+        'miniflux': {'base_url': miniflux.url, 'api_key': 'benchmark', 'page_size': args.page_size},
+        'llm': {
+            'base_url': llm.url + '/v1',
+            'api_key': 'benchmark',
+            'model': 'mock-model',
+            'timeout': 30,
+            'max_workers': args.workers,
+            'RPM': args.rpm,
+            'cache_size': args.cache_size,
+            'stream': args.stream,
+        },
+        'storage': {'dir': storage_dir},
+        'workers': {'processes': args.processes},
+        # synthetic entries repeat the same paragraphs, so they are near-duplicates of each other
+        'dedup': {'enabled': args.dedup},
+        'ai_news': {
+            'url': 'http://127.0.0.1',
+            'prompts': {
+                'greeting': 'Greet the reader.',
+                'summary': 'Summarize the news above in five sentences.',
+                'summary_block': 'Group the news above by category.',
+            },
+        },
+        'agents': {
+            'summary': {
+                'title': 'AI summary:',
+                'prompt': '${content}\n---\nSummarize the above content in three sentences.',
+                'style_block': True,
+                'deny_list': ['https://ai-news.miniflux'],
+            },
+            'translate': {
+                'title': 'AI translate: ',
+                'prompt': 'Translate the following news into Chinese.',
+                'style_block': False,
+                'auto_translate_non_chinese': True,
+            },
+        },
+    }
+    with open(path, 'w', encoding='utf8') as file:
+        yaml.safe_dump(config, file, allow_unicode=True)
+
+
+class PathReport:
+    def __init__(self, name, llm):
+        self.name = name
+        self.llm = llm
+        self.timings = []
+        self.peak_memory = None
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.calls_before = self.llm.calls
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self.started
+        if tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+        self.llm_calls = self.llm.calls - self.calls_before
+
+    def as_dict(self, entries):
+        return {
+            'path': self.name,
+            'entries': entries,
+            'duration_s': round(self.duration, 3),
+            'entries_per_s': round(entries / self.duration, 2) if self.duration else 0.0,
+            'p50_entry_s': round(_percentile(self.timings, 50), 3),
+            'p95_entry_s': round(_percentile(self.timings, 95), 3),
+            'peak_python_mb': round(self.peak_memory / 2 ** 20, 1) if self.peak_memory is not None else None,
+            'llm_calls': self.llm_calls,
+            'llm_calls_per_entry': round(self.llm_calls / entries, 2) if entries else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=200, help='unread entries for the poller path')
+    parser.add_argument('--webhook-entries', type=int, default=100, help='entries delivered through the webhook')
+    parser.add_argument('--webhook-batch', type=int, default=10, help='entries per webhook request')
+    parser.add_argument('--cjk-ratio', type=float, default=0.3, help='share of Chinese-language entries')
+    parser.add_argument('--feeds', type=int, default=20)
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='mean mock LLM latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of LLM calls answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='share of LLM calls answered with 429')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rpm', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--cache-size', type=int, default=0, help='LLM response cache size, 0 disables it')
+    parser.add_argument('--dedup', action='store_true', help='reuse agent outputs across near-duplicate entries')
+    parser.add_argument('--stream', action='store_true', help='consume LLM answers as streams')
+    parser.add_argument('--processes', type=int, default=0, help='worker processes for HTML/markdown conversion')
+    parser.add_argument('--paths', default='poll,webhook,digest')
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='track per-path Python peak memory with tracemalloc (slows the run down noticeably)')
+    args = parser.parse_args()
+    paths = set(args.paths.split(','))
+
+    llm = MockLLMServer(latency=args.llm_latency, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate).start()
+    miniflux = MockMinifluxServer(make_entries(args.entries, args.cjk_ratio, args.feeds)).start()
+
+    workdir = tempfile.mkdtemp(prefix='miniflux-ai-bench-')
+    _write_config(os.path.join(workdir, 'config.yml'), args, llm, miniflux, os.path.join(workdir, 'data'))
+    os.chdir(workdir)
+    sys.path.insert(0, str(PROJECT_ROOT))
+    if args.trace_memory:
+        tracemalloc.start()
+
+    # Imported late: the application reads config.yml from the working directory on import.
+    from common.config import Config
+    from core.fetch_unread_entries import fetch_unread_entries
+    from core.generate_daily_news import generate_daily_news
+    from core.miniflux_client import miniflux_client, write_back
+    from core.work_queue import get_work_queue
+    from myapp import app
+
+    config = Config()
+    work_queue = get_work_queue(miniflux_client)
+    handler = work_queue.handler
+    current = {'report': None}
+
+    def timed_handler(entry):
+        started = time.perf_counter()
+        try:
+            return handler(entry)
+        finally:
+            current['report'].timings.append(time.perf_counter() - started)
+
+    work_queue.handler = timed_handler
+
+    def drained():
+        stats = work_queue.stats()
+        return stats['depth'] == 0 and not stats['in_flight'] and write_back.depth() == 0
+
+    reports = []
+    if 'poll' in paths:
+        with PathReport('poll', llm) as report:
+            current['report'] = report
+            fetch_unread_entries(config, miniflux_client)
+            _wait_until(drained, args.timeout)
+        reports.append(report.as_dict(args.entries))
+
+    if 'webhook' in paths:
+        webhook_entries = make_entries(args.webhook_entries, args.cjk_ratio, args.feeds, start_id=args.entries + 1)
+        miniflux.add_entries(webhook_entries)
+        client = app.test_client()
+        with PathReport('webhook', llm) as report:
+            current['report'] = report
+            for start in range(0, len(webhook_entries), args.webhook_batch):
+                batch = webhook_entries[start:start + args.webhook_batch]
+                client.post('/api/miniflux-ai', json={'feed': batch[0]['feed'], 'entries': batch})
+            _wait_until(drained, args.timeout)
+        reports.append(report.as_dict(args.webhook_entries))
+
+    if 'digest' in paths:
+        with PathReport('digest', llm) as report:
+            current['report'] = report
+            generate_daily_news(miniflux_client)
+        reports.append(report.as_dict(0))
+
+    summary = {
+        'reports': reports,
+        'llm_errors': llm.errors,
+        'llm_rate_limited': llm.rate_limited,
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        columns = ['path', 'entries', 'duration_s', 'entries_per_s', 'p50_entry_s', 'p95_entry_s',
+                   'peak_python_mb', 'llm_calls', 'llm_calls_per_entry']
+        print(' '.join(f'{column:>16}' for column in columns))
+        for report in reports:
+            print(' '.join(f'{report[column]!s:>16}' for column in columns))
+        print(f"llm errors={summary['llm_errors']} rate_limited={summary['llm_rate_limited']} "
+              f"max_rss={summary['max_rss_mb']}MB")
+
+    llm.stop()
+    miniflux.stop()
+
+
+if __name__ == '__main__':
+    main()
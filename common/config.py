@@ -1,3 +1,5 @@
+import socket
+
 from yaml import safe_load
 
 class Config:
@@ -8,19 +10,75 @@ class Config:
         self.miniflux_base_url = self.get_config_value('miniflux', 'base_url', None)
         self.miniflux_api_key = self.get_config_value('miniflux', 'api_key', None)
         self.miniflux_webhook_secret = self.get_config_value('miniflux', 'webhook_secret', None)
+        self.miniflux_page_size = self.get_config_value('miniflux', 'page_size', 100)
+        self.miniflux_incremental_fetch = self.get_config_value('miniflux', 'incremental_fetch', True)
+        self.miniflux_write_concurrency = self.get_config_value('miniflux', 'write_concurrency', 4)
+        self.miniflux_pool_size = self.get_config_value('miniflux', 'pool_size', 16)
 
         self.llm_base_url = self.get_config_value('llm', 'base_url', None)
         self.llm_api_key = self.get_config_value('llm', 'api_key', None)
         self.llm_model = self.get_config_value('llm', 'model', None)
         self.llm_timeout = self.get_config_value('llm', 'timeout', 60)
+        self.llm_stream = self.get_config_value('llm', 'stream', False)
+        self.llm_max_seconds = self.get_config_value('llm', 'max_seconds', None)
+        self.llm_max_output_tokens = self.get_config_value('llm', 'max_output_tokens', None)
+        # without explicit backends the llm section itself is the only backend
+        self.llm_backends = self.get_config_value('llm', 'backends', None) or [{'name': 'default'}]
+        self.llm_backend_cooldown = self.get_config_value('llm', 'backend_cooldown', 30)
         self.llm_max_workers = self.get_config_value('llm', 'max_workers', 4)
         self.llm_RPM = self.get_config_value('llm', 'RPM', 1000)
+        self.llm_TPM = self.get_config_value('llm', 'TPM', None)
+        self.llm_max_in_flight = self.get_config_value('llm', 'max_in_flight', self.llm_max_workers)
+        self.llm_agent_parallelism = self.get_config_value('llm', 'agent_parallelism', 4)
+        self.llm_max_input_tokens = self.get_config_value('llm', 'max_input_tokens', 6000)
+        self.llm_queue_size = self.get_config_value('llm', 'queue_size', self.llm_max_workers * 4)
+        self.llm_cache_ttl = self.get_config_value('llm', 'cache_ttl', 7 * 24 * 3600)
+        self.llm_cache_size = self.get_config_value('llm', 'cache_size', 5000)
 
         self.ai_news_url = self.get_config_value('ai_news', 'url', None)
         self.ai_news_schedule = self.get_config_value('ai_news', 'schedule', None)
         self.ai_news_prompts = self.get_config_value('ai_news', 'prompts', None)
+        self.ai_news_chunk_tokens = self.get_config_value('ai_news', 'chunk_tokens', 6000)
+        self.ai_news_keep = self.get_config_value('ai_news', 'keep', 7)
+        self.ai_news_incremental = self.get_config_value('ai_news', 'incremental', False)
+        self.ai_news_fold_interval = self.get_config_value('ai_news', 'fold_interval', 30)
 
         self.agents = self.c.get('agents', {})
 
+        self.filter_sample_chars = self.get_config_value('filter', 'sample_chars', 2000)
+        self.filter_feed_languages = self.get_config_value('filter', 'feed_languages', {})
+        self.filter_learn_after = self.get_config_value('filter', 'learn_after', 0)
+
+        self.storage_dir = self.get_config_value('storage', 'dir', '.')
+
+        self.workers_processes = self.get_config_value('workers', 'processes', 0)
+        self.workers_http_threads = self.get_config_value('workers', 'http_threads', 8)
+
+        self.cluster_shared_dir = self.get_config_value('cluster', 'shared_dir', None)
+        self.cluster_replica_id = self.get_config_value('cluster', 'replica_id', socket.gethostname())
+        self.cluster_lease_ttl = self.get_config_value('cluster', 'lease_ttl', 600)
+
+        self.dedup_enabled = self.get_config_value('dedup', 'enabled', True)
+        self.dedup_max_distance = self.get_config_value('dedup', 'max_distance', 3)
+        self.dedup_retention = self.get_config_value('dedup', 'retention', 48 * 3600)
+
+        self.scheduling_poll_delay = self.get_config_value('scheduling', 'poll_delay', 600)
+        self.scheduling_recency_weight = self.get_config_value('scheduling', 'recency_weight', 0.01)
+        self.scheduling_max_delay = self.get_config_value('scheduling', 'max_delay', 3600)
+        self.scheduling_feeds = self.get_config_value('scheduling', 'feeds', {})
+        self.scheduling_categories = self.get_config_value('scheduling', 'categories', {})
+        # webhooks deliver new entries as they arrive, so polling is only a safety net then
+        self.scheduling_poll_interval = self.get_config_value(
+            'scheduling', 'poll_interval', 900 if self.miniflux_webhook_secret else 60
+        )
+        self.scheduling_min_poll_interval = self.get_config_value('scheduling', 'min_poll_interval', 30)
+        self.scheduling_max_poll_interval = self.get_config_value(
+            'scheduling', 'max_poll_interval', self.scheduling_poll_interval * 4
+        )
+        self.scheduling_force_poll_after = self.get_config_value('scheduling', 'force_poll_after', 3600)
+
+        self.quota_feeds = self.get_config_value('quotas', 'feeds', {})
+        self.quota_categories = self.get_config_value('quotas', 'categories', {})
+
     def get_config_value(self, section, key, default=None):
         return self.c.get(section, {}).get(key, default)
\ No newline at end of file
@@ -0,0 +1,28 @@
+import os
+import sqlite3
+
+
+def data_path(config, filename):
+    """Return the absolute location of a state file inside ``storage.dir``."""
+    os.makedirs(config.storage_dir, exist_ok=True)
+    return os.path.join(config.storage_dir, filename)
+
+
+def shared_path(config, filename):
+    """Location of a state file shared by all replicas: ``cluster.shared_dir`` if set, else ``storage.dir``."""
+    if not config.cluster_shared_dir:
+        return data_path(config, filename)
+    os.makedirs(config.cluster_shared_dir, exist_ok=True)
+    return os.path.join(config.cluster_shared_dir, filename)
+
+
+def connect(path):
+    """Open a SQLite database shared by worker threads.
+
+    Callers are expected to guard the returned connection with their own lock;
+    WAL mode keeps readers from blocking the single writer.
+    """
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
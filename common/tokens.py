@@ -0,0 +1,51 @@
+import re
+
+_CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate: one token per CJK character, four characters per token otherwise."""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_message_tokens(messages):
+    # A few tokens of framing per message, as in the OpenAI chat format.
+    return sum(estimate_tokens(message.get('content') or '') + 4 for message in messages)
+
+
+def split_by_budget(texts, budget):
+    """Group consecutive texts into chunks whose estimated size stays within ``budget`` tokens.
+
+    A single text larger than the budget becomes a chunk of its own.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for text in texts:
+        size = estimate_tokens(text)
+        if current and used + size > budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(text)
+        used += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def truncate_to_budget(text, budget, marker='\n\n[…]'):
+    """Trim ``text`` to roughly ``budget`` tokens, preferring to cut at a paragraph break."""
+    if not budget or estimate_tokens(text) <= budget:
+        return text
+
+    cut = int(len(text) * budget / estimate_tokens(text))
+    while cut > 0 and estimate_tokens(text[:cut]) > budget:
+        cut = int(cut * 0.9)
+    paragraph = text.rfind('\n', 0, cut)
+    if paragraph > cut * 0.8:
+        cut = paragraph
+    return text[:cut].rstrip() + marker
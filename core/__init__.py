@@ -1,3 +0,0 @@
-from .fetch_unread_entries import fetch_unread_entries
-from .process_entries import process_entry
-from .generate_daily_news import generate_daily_news
\ No newline at end of file
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import markdown
+from feedgen.feed import FeedGenerator
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+FEED_URL = 'https://ai-news.miniflux'
+
+
+class AINewsFeed:
+    """Pre-rendered, versioned RSS document holding the last ``keep`` digests.
+
+    Digests are rendered once when published; readers get the cached XML along
+    with an ETag and Last-Modified, so serving the feed never mutates it. The
+    on-disk copy is reloaded when another process publishes.
+    """
+
+    def __init__(self, path, keep):
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._items = []
+        self._mtime = None
+        self._document = None
+
+    def publish(self, content):
+        now = datetime.now().astimezone()
+        item = {
+            'id': FEED_URL + now.strftime('%Y-%m-%d-%H-%M'),
+            'title': f"{'Morning' if now.hour < 12 else 'Nightly'} Newsᴬᴵ for you - {now.strftime('%Y-%m-%d')}",
+            'description': markdown.markdown(content),
+            'published': now.timestamp(),
+        }
+        with self._lock:
+            self._load()
+            self._items = [item] + [i for i in self._items if i['id'] != item['id']][:self.keep - 1]
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf8') as file:
+                json.dump(self._items, file, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+            self._render()
+        logger.info('Published AI news entry | id=%s | retained=%s', item['id'], len(self._items))
+
+    def document(self):
+        """Return ``(xml, etag, last_modified)`` for the current feed version."""
+        with self._lock:
+            self._load()
+            if self._document is None:
+                self._render()
+            return self._document
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf8') as file:
+                items = json.load(file)
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.error('Failed to read %s', self.path, exc_info=exc)
+            return
+
+        if isinstance(items, str):
+            # ai_news.json used to hold a single pending markdown digest
+            items = [{
+                'id': FEED_URL + time.strftime('%Y-%m-%d-%H-%M', time.localtime(mtime / 1e9)),
+                'title': f"Newsᴬᴵ for you - {time.strftime('%Y-%m-%d', time.localtime(mtime / 1e9))}",
+                'description': markdown.markdown(items),
+                'published': mtime / 1e9,
+            }] if items else []
+        self._items = items[:self.keep]
+        self._mtime = mtime
+        self._document = None
+
+    def _render(self):
+        fg = FeedGenerator()
+        fg.id(FEED_URL)
+        fg.title('֎Newsᴬᴵ for you')
+        fg.subtitle('Powered by miniflux-ai')
+        fg.author({'name': 'miniflux-ai'})
+        fg.link(href=FEED_URL, rel='self')
+
+        fe_welcome = fg.add_entry()
+        fe_welcome.id(FEED_URL)
+        fe_welcome.link(href=FEED_URL)
+        fe_welcome.title('Welcome to Newsᴬᴵ')
+        fe_welcome.description(markdown.markdown('Welcome to Newsᴬᴵ'))
+
+        # feedgen emits entries in reverse insertion order; add oldest first
+        for item in reversed(self._items):
+            fe = fg.add_entry()
+            fe.id(item['id'])
+            fe.link(href=item['id'])
+            fe.title(item['title'])
+            fe.description(item['description'])
+            fe.pubDate(datetime.fromtimestamp(item['published'], tz=timezone.utc))
+
+        last_modified = datetime.fromtimestamp(self._items[0]['published'] if self._items else 0, tz=timezone.utc)
+        fg.lastBuildDate(last_modified)
+        xml = fg.rss_str(pretty=True)
+        etag = hashlib.sha256(xml).hexdigest()[:32]
+        self._document = (xml, etag, last_modified)
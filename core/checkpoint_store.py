@@ -0,0 +1,60 @@
+import threading
+import time
+
+from common.storage import connect
+
+
+class CheckpointStore:
+    """Durable per-agent results of entries that have not been written back yet.
+
+    Each agent output is saved as soon as its LLM call returns, together with
+    the agent hash and the hash of the entry content it was produced from, so an
+    entry interrupted by a restart only reruns the agents that had not
+    finished. Answers that were cut short keep their ``partial`` reason so they
+    are not taken for complete ones after a resume. Checkpoints are cleared
+    once the entry reaches the write-back spool.
+    """
+
+    def __init__(self, path, retention=7 * 24 * 3600):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoints ('
+                'entry_id INTEGER NOT NULL, agent_name TEXT NOT NULL, prompt_hash TEXT NOT NULL, '
+                'content_hash TEXT NOT NULL, output TEXT NOT NULL, saved_at REAL NOT NULL, partial TEXT, '
+                'PRIMARY KEY (entry_id, agent_name))'
+            )
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(checkpoints)')}
+            if 'partial' not in columns:
+                # databases created before partial answers were tracked
+                self._conn.execute('ALTER TABLE checkpoints ADD COLUMN partial TEXT')
+
+    def save(self, entry_id, source_hash, agent_name, prompt_hash, output, partial=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO checkpoints '
+                '(entry_id, agent_name, prompt_hash, content_hash, output, saved_at, partial) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (entry_id, agent_name, prompt_hash, source_hash, output, time.time(), partial),
+            )
+
+    def load(self, entry_id, source_hash):
+        """Map agent name to (prompt hash, output, partial reason) for checkpoints of content hashing to ``source_hash``."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT agent_name, prompt_hash, output, partial FROM checkpoints '
+                'WHERE entry_id = ? AND content_hash = ?',
+                (entry_id, source_hash),
+            ).fetchall()
+        return {agent_name: (prompt_hash, output, partial) for agent_name, prompt_hash, output, partial in rows}
+
+    def clear(self, entry_id):
+        with self._lock:
+            self._conn.execute('DELETE FROM checkpoints WHERE entry_id = ?', (entry_id,))
+
+    def prune(self):
+        """Drop checkpoints of entries that were never retried within ``retention`` seconds."""
+        with self._lock:
+            self._conn.execute('DELETE FROM checkpoints WHERE saved_at < ?', (time.time() - self.retention,))
@@ -0,0 +1,58 @@
+import concurrent.futures
+import multiprocessing
+import signal
+import threading
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _init_worker():
+    # Ctrl-C and container stops are handled by the parent process.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class CPUPool:
+    """Runs CPU-bound stages (HTML to markdown, markdown to HTML) outside the GIL of the main process.
+
+    With ``processes`` set to 0 the stages run inline in the calling thread.
+    Workers are spawned rather than forked: the pool starts on first use, when
+    the process already runs threads whose locks a forked child could inherit
+    mid-acquire. Stages must therefore be module-level functions of their
+    arguments, importable without side effects.
+    """
+
+    def __init__(self, processes=0):
+        self.processes = processes
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+                logger.info('Started CPU worker processes | processes=%s', self.processes)
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self.processes:
+            return fn(*args)
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        except concurrent.futures.process.BrokenProcessPool:
+            # a worker was killed (e.g. OOM); start a fresh pool for the next caller
+            with self._lock:
+                self._executor = None
+            logger.warning('CPU worker pool broke; restarting it')
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
@@ -1,63 +1,215 @@
 import fnmatch
+import json
 import re
+import threading
+from collections import namedtuple
 
 _CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+_HTML_TOKEN = re.compile(r'<(script|style|svg)\b.*?</\1\s*>|<!--.*?-->|<[^>]*>|[^<]+', re.IGNORECASE | re.DOTALL)
+_SITE_MEMO_LIMIT = 4096
+_FEED_LANGUAGES = {'chinese': True, 'other': False}
 
-def _extract_plain_text(entry):
-    content = entry.get('content') or ''
+_AgentRule = namedtuple('_AgentRule', 'name allow deny auto_translate_non_chinese')
+
+# Per-feed language verdicts, site_url -> (is_chinese, streak). They describe
+# the feeds rather than the agents, so they outlive plan rebuilds.
+_learned_languages = {}
+_learned_lock = threading.Lock()
+
+
+def _detect_cjk(entry, sample_chars):
+    """Look for CJK in the title and the first ``sample_chars`` visible characters of the content.
+
+    Tags, comments and script/style/svg bodies are stepped over without copying
+    the article, so the cost is bounded by the sample rather than the page size.
+    """
     title = entry.get('title') or ''
-    raw_text = f"{title}\n{content}"
-    return re.sub(r'<[^>]+>', ' ', raw_text)
+    if _CJK_PATTERN.search(title):
+        return True
 
+    content = entry.get('content') or ''
+    remaining = sample_chars
+    for match in _HTML_TOKEN.finditer(content):
+        if content[match.start()] == '<':
+            continue
+        end = min(match.end(), match.start() + remaining)
+        if _CJK_PATTERN.search(content, match.start(), end):
+            return True
+        remaining -= end - match.start()
+        if remaining <= 0:
+            break
+    return False
 
-def _contains_cjk(text):
-    return bool(_CJK_PATTERN.search(text))
 
+def _compile_globs(patterns):
+    """Combine glob patterns into one regex; ``None`` keeps the list undefined, ``[]`` matches nothing."""
+    if patterns is None:
+        return None
+    if not patterns:
+        return re.compile(r'(?!)')
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
 
-def filter_entry(config, agent, entry):
-    start_with_list = [name[1]['title'] for name in config.agents.items()]
-    style_block = [name[1]['style_block'] for name in config.agents.items()]
-    [start_with_list.append('<pre') for i in style_block if i]
 
+def _compile_rule(agent_name, agent_config):
     # Todo Compatible with whitelist/blacklist parameter, to be removed
-    agent_config = agent[1]
     allow_list = agent_config.get('allow_list') if agent_config.get('allow_list') is not None else agent_config.get('whitelist')
-    deny_list = agent_config['deny_list'] if agent_config.get('deny_list') is not None else agent_config.get('blacklist')
-    auto_translate_non_chinese = agent_config.get('auto_translate_non_chinese', False)
+    deny_list = agent_config.get('deny_list') if agent_config.get('deny_list') is not None else agent_config.get('blacklist')
+    return _AgentRule(
+        agent_name,
+        _compile_globs(allow_list),
+        _compile_globs(deny_list),
+        agent_config.get('auto_translate_non_chinese', False),
+    )
 
-    site_url = (entry.get('feed') or {}).get('site_url', '')
-    entry_id = entry.get('id')
 
-    # filter, if not content starts with start flag
-    if not entry['content'].startswith(tuple(start_with_list)):
-        plain_text = _extract_plain_text(entry)
-        has_cjk = _contains_cjk(plain_text)
+class FilterPlan:
+    """Immutable agent filter plan compiled once from ``config.agents``.
 
-        # filter, if in allow_list
-        if allow_list is not None:
-            matched_pattern = next((pattern for pattern in allow_list if fnmatch.fnmatch(site_url, pattern)), None)
-            if matched_pattern:
-                if auto_translate_non_chinese:
-                    decision = not has_cjk
-                    return decision
-                return True
-            return False
+    Holds the "already processed" prefix tuple, one combined regex per allow and
+    deny list, and a memo of per-site decisions so the globs run once per feed.
+    """
+
+    def __init__(self, agents, sample_chars=2000, feed_languages=None, learn_after=0):
+        prefixes = [agent_config.get('title', '') for agent_config in agents.values()]
+        if any(agent_config.get('style_block') for agent_config in agents.values()):
+            prefixes.append('<pre')
+        self.prefixes = tuple(prefixes)
+        self.rules = tuple(_compile_rule(name, agent_config) for name, agent_config in agents.items())
+        self._rule_index = {rule.name: index for index, rule in enumerate(self.rules)}
+        self.sample_chars = sample_chars
+        self.learn_after = learn_after
+        self._feed_languages = tuple(
+            (_compile_globs([pattern]), _FEED_LANGUAGES[language])
+            for pattern, language in (feed_languages or {}).items()
+        )
+        self._site_memo = {}
+        self._selections = {}
+        self._memo_lock = threading.Lock()
+
+    def _site_decisions(self, site_url):
+        decisions = self._site_memo.get(site_url)
+        if decisions is None:
+            decisions = tuple(self._site_allows(rule, site_url) for rule in self.rules)
+            with self._memo_lock:
+                if len(self._site_memo) >= _SITE_MEMO_LIMIT:
+                    self._site_memo.clear()
+                self._site_memo[site_url] = decisions
+        return decisions
 
+    @staticmethod
+    def _site_allows(rule, site_url):
+        # filter, if in allow_list
+        if rule.allow is not None:
+            return rule.allow.match(site_url) is not None
         # filter, if not in deny_list
-        elif deny_list is not None:
-            matched_pattern = next((pattern for pattern in deny_list if fnmatch.fnmatch(site_url, pattern)), None)
-            if matched_pattern:
-                return False
-            if auto_translate_non_chinese:
-                decision = not has_cjk
-                return decision
-            return True
+        if rule.deny is not None:
+            return rule.deny.match(site_url) is None
+        return True
 
-        # filter, if allow_list and deny_list are both None
-        elif allow_list is None and deny_list is None:
-            if auto_translate_non_chinese:
-                decision = not has_cjk
-                return decision
-            return True
+    def _feed_language(self, site_url):
+        for pattern, is_chinese in self._feed_languages:
+            if pattern.match(site_url):
+                return is_chinese
+        verdict, streak = _learned_languages.get(site_url, (None, 0))
+        if self.learn_after and streak >= self.learn_after:
+            return verdict
+        return None
 
-    return False
+    @staticmethod
+    def _learn(site_url, is_chinese):
+        with _learned_lock:
+            if len(_learned_languages) >= _SITE_MEMO_LIMIT:
+                _learned_languages.clear()
+            verdict, streak = _learned_languages.get(site_url, (None, 0))
+            _learned_languages[site_url] = (is_chinese, streak + 1 if verdict == is_chinese else 1)
+
+    def has_cjk(self, entry):
+        """Language verdict for ``entry``; known-language feeds skip detection entirely."""
+        site_url = (entry.get('feed') or {}).get('site_url') or ''
+        is_chinese = self._feed_language(site_url)
+        if is_chinese is None:
+            is_chinese = _detect_cjk(entry, self.sample_chars)
+            if self.learn_after:
+                self._learn(site_url, is_chinese)
+        return is_chinese
+
+    def agents_for(self, entry):
+        """Names of the agents that should run for ``entry``, in configured order."""
+        # filter, if not content starts with start flag
+        if (entry.get('content') or '').startswith(self.prefixes):
+            return []
+
+        site_url = (entry.get('feed') or {}).get('site_url') or ''
+        has_cjk = None
+        selected = []
+        for rule, allowed in zip(self.rules, self._site_decisions(site_url)):
+            if not allowed:
+                continue
+            if rule.auto_translate_non_chinese:
+                if has_cjk is None:
+                    # computed at most once per entry and shared by every agent
+                    has_cjk = self.has_cjk(entry)
+                if has_cjk:
+                    continue
+            selected.append(rule.name)
+        return selected
+
+    def classify(self, entries):
+        """Map each entry id of a page to the agents that should run for it.
+
+        Non-empty selections are kept until :meth:`selection` picks them up, so
+        the worker that processes a polled entry does not classify it again.
+        """
+        selections = {entry['id']: self.agents_for(entry) for entry in entries}
+        with self._memo_lock:
+            if len(self._selections) >= _SITE_MEMO_LIMIT:
+                self._selections.clear()
+            self._selections.update((entry_id, selected) for entry_id, selected in selections.items() if selected)
+        return selections
+
+    def selection(self, entry):
+        """Agents for ``entry``, reusing the result of an earlier :meth:`classify` if there is one."""
+        with self._memo_lock:
+            selected = self._selections.pop(entry.get('id'), None)
+        return self.agents_for(entry) if selected is None else selected
+
+    def allows(self, agent_name, entry):
+        return agent_name in self.agents_for(entry)
+
+
+_cached_plan = (None, None, None)
+_cached_plan_lock = threading.Lock()
+
+
+def get_filter_plan(config):
+    """Return the plan for ``config``'s agents and filter settings, compiling it only when they change.
+
+    Every module holds its own ``Config()``; they all share one plan as long
+    as their settings are equal.
+    """
+    global _cached_plan
+    agents, key, plan = _cached_plan
+    if agents is config.agents:
+        return plan
+    settings = (
+        getattr(config, 'filter_sample_chars', 2000),
+        getattr(config, 'filter_feed_languages', None),
+        getattr(config, 'filter_learn_after', 0),
+    )
+    new_key = json.dumps([config.agents, settings], sort_keys=True, default=str)
+    with _cached_plan_lock:
+        agents, key, plan = _cached_plan
+        if key != new_key:
+            sample_chars, feed_languages, learn_after = settings
+            plan = FilterPlan(config.agents, sample_chars=sample_chars, feed_languages=feed_languages,
+                              learn_after=learn_after)
+        _cached_plan = (config.agents, new_key, plan)
+    return plan
+
+
+def filter_entry(config, agent, entry):
+    agent_name, agent_config = agent
+    plan = get_filter_plan(config)
+    if agent_name not in plan._rule_index:
+        plan = FilterPlan(dict(config.agents, **{agent_name: agent_config}))
+    return plan.allows(agent_name, entry)
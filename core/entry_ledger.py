@@ -0,0 +1,78 @@
+import hashlib
+import json
+import threading
+import time
+
+from common.storage import connect
+
+
+def content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def agent_hash(agent_config):
+    """Hash of an agent definition; changing the prompt, title or filters invalidates past results."""
+    return content_hash(json.dumps(agent_config, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def agents_hash(agents):
+    return content_hash(''.join(f'{name}:{agent_hash(agent)}' for name, agent in agents.items()))
+
+
+class EntryLedger:
+    """Persistent record of which (entry, agent) pairs have already been handled.
+
+    A row is keyed by entry id, agent name and agent hash, so editing an agent
+    re-opens its entries while a Miniflux-side rewrite of the content does not.
+    The content hash of the processed source is kept alongside for auditing.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS processed ('
+                'entry_id INTEGER NOT NULL, agent_name TEXT NOT NULL, prompt_hash TEXT NOT NULL, '
+                'content_hash TEXT, status TEXT NOT NULL, processed_at REAL NOT NULL, '
+                'PRIMARY KEY (entry_id, agent_name, prompt_hash))'
+            )
+            self._conn.execute('CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    def unhandled(self, entries, agents):
+        """Return the entries that still have at least one agent without a ledger row."""
+        if not entries:
+            return []
+        expected = {(name, agent_hash(agent)) for name, agent in agents.items()}
+        ids = [entry['id'] for entry in entries]
+        placeholders = ','.join('?' * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT entry_id, agent_name, prompt_hash FROM processed WHERE entry_id IN ({placeholders})',
+                ids,
+            ).fetchall()
+
+        seen = {}
+        for entry_id, agent_name, prompt_hash in rows:
+            seen.setdefault(entry_id, set()).add((agent_name, prompt_hash))
+        return [entry for entry in entries if not expected <= seen.get(entry['id'], set())]
+
+    def record(self, entry, results):
+        """Store the outcome of each agent for an entry; ``results`` maps agent name to (config, status)."""
+        now = time.time()
+        source_hash = content_hash(entry.get('content'))
+        rows = [
+            (entry['id'], agent_name, agent_hash(agent_config), source_hash, status, now)
+            for agent_name, (agent_config, status) in results.items()
+        ]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def get_cursor(self, name):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM cursors WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def set_cursor(self, name, value):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO cursors VALUES (?, ?)', (name, value))
@@ -0,0 +1,314 @@
+import concurrent.futures
+import heapq
+import itertools
+import json
+import threading
+import time
+
+from common.logger import get_logger
+from common.metrics import Counter, Gauge
+from common.storage import connect
+from core.feed_quota import FeedQuotas
+from core.priority import PriorityPolicy
+
+logger = get_logger(__name__)
+
+QUEUE_DEPTH = Gauge('miniflux_ai_work_queue_depth', 'Entries waiting in the shared work queue.')
+QUEUE_IN_FLIGHT = Gauge('miniflux_ai_work_queue_in_flight', 'Entries currently being processed.')
+QUEUE_DEFERRED = Counter('miniflux_ai_work_queue_deferred_total', 'Entries held back by feed/category quotas.')
+QUEUE_SUBMITTED = Counter('miniflux_ai_work_queue_submitted_total', 'Entries submitted to the work queue.', ['source'])
+QUEUE_LEASE_CONFLICTS = Counter(
+    'miniflux_ai_work_queue_lease_conflicts_total', 'Entries left to the replica that holds their lease.',
+)
+
+
+# Result of a work item whose feed or category is over its hourly quota. Only
+# the entry id and the time its quota frees up are kept (see
+# EntryQueue.due_deferred); the entry itself is dropped and must be submitted
+# again by then.
+DEFERRED = object()
+
+# Result of a work item leased by another replica, which processes it instead.
+CLAIMED_ELSEWHERE = object()
+
+
+class EntryQueue:
+    """Durable, de-duplicating priority queue drained by a long-lived worker pool.
+
+    Queued entries are mirrored to SQLite so a restart replays them, and are
+    served in the order given by ``policy`` (see :class:`PriorityPolicy`). An
+    entry id is accepted at most once while it is queued or in flight;
+    submitting it again returns the future of the existing work item, raising
+    its priority if the new source ranks higher. ``quotas`` may hold entries
+    back per feed or category (see :class:`FeedQuotas`); such entries are not
+    kept queued, so a throttled feed cannot pile its backlog up in memory.
+
+    With a shared ``leases`` store, replicas only queue the entries whose
+    lease they win, keep renewing it while the entry is queued or in flight,
+    and release it when the entry is finished.
+    """
+
+    def __init__(self, path, handler, workers, policy=None, quotas=None, leases=None, owner=None, lease_ttl=600):
+        self.handler = handler
+        self.workers = workers
+        self.policy = policy or PriorityPolicy()
+        self.quotas = quotas or FeedQuotas()
+        self.leases = leases
+        self.owner = owner
+        self.lease_ttl = lease_ttl
+        self.processed = 0
+        self.failed = 0
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._heap = []
+        self._deferred = {}
+        self._sequence = itertools.count()
+        self._in_flight = {}
+        self._futures = {}
+        self._threads = []
+        self._conn = connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS queue ('
+            'entry_id INTEGER PRIMARY KEY, source TEXT NOT NULL, payload TEXT NOT NULL, enqueued_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS deferred (entry_id INTEGER PRIMARY KEY, ready_at REAL NOT NULL)')
+        self._deferred.update(self._conn.execute('SELECT entry_id, ready_at FROM deferred'))
+        for entry_id, source, payload, enqueued_at in self._conn.execute(
+                'SELECT entry_id, source, payload, enqueued_at FROM queue ORDER BY enqueued_at'):
+            self._push(entry_id, json.loads(payload), source, enqueued_at)
+            self._futures[entry_id] = concurrent.futures.Future()
+        if self.leases and self._pending:
+            # while this replica was down another one may have taken over its entries
+            held = self.leases.claim(list(self._pending), self.owner, self.lease_ttl)
+            for entry_id in [entry_id for entry_id in self._pending if entry_id not in held]:
+                self._conn.execute('DELETE FROM queue WHERE entry_id = ?', (entry_id,))
+                del self._pending[entry_id]
+                del self._futures[entry_id]
+        self.replayed = list(self._pending)
+        if self.replayed:
+            logger.info('Replaying queued entries from previous run | count=%s', len(self.replayed))
+
+    def _push(self, entry_id, entry, source, enqueued_at):
+        key = self.policy.key(entry, source, enqueued_at)
+        self._pending[entry_id] = (entry, source, enqueued_at, key)
+        heapq.heappush(self._heap, (key, next(self._sequence), entry_id))
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'entry-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.leases:
+            thread = threading.Thread(target=self._renew_leases, name='lease-renewer', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, entry, source):
+        entry_id = entry['id']
+        with self._cond:
+            future = self._resubmit(entry, source)
+            if future is None and self._admit(entry, time.time()) is DEFERRED:
+                future = concurrent.futures.Future()
+                future.set_result(DEFERRED)
+        if future is not None:
+            return future
+
+        # Claiming may wait on another replica's transaction, so it happens
+        # outside the lock the workers and other submitters need.
+        if self.leases and entry_id not in self.leases.claim([entry_id], self.owner, self.lease_ttl):
+            QUEUE_LEASE_CONFLICTS.inc()
+            logger.debug('Entry %s is leased by another replica; leaving it to them', entry_id)
+            future = concurrent.futures.Future()
+            future.set_result(CLAIMED_ELSEWHERE)
+            return future
+
+        with self._cond:
+            # another submitter may have queued it while the lease was claimed
+            future = self._resubmit(entry, source)
+            if future is not None:
+                return future
+            enqueued_at = time.time()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO queue VALUES (?, ?, ?, ?)',
+                (entry_id, source, json.dumps(entry, ensure_ascii=False), enqueued_at),
+            )
+            future = concurrent.futures.Future()
+            self._futures[entry_id] = future
+            self._push(entry_id, entry, source, enqueued_at)
+            self._cond.notify()
+            QUEUE_SUBMITTED.inc(source=source)
+            return future
+
+    def _resubmit(self, entry, source):
+        """Future for an entry already queued or in flight, else ``None``; call with the lock held."""
+        entry_id = entry['id']
+        future = self._futures.get(entry_id)
+        if future is None:
+            return None
+        queued = self._pending.get(entry_id)
+        if queued and self.policy.key(entry, source, queued[2]) < queued[3]:
+            self._conn.execute('UPDATE queue SET source = ? WHERE entry_id = ?', (source, entry_id))
+            self._push(entry_id, queued[0], source, queued[2])
+            logger.debug('Entry %s re-prioritized by %s submission', entry_id, source)
+        else:
+            logger.debug('Entry %s already queued or in flight; ignoring duplicate from %s', entry_id, source)
+        return future
+
+    def _admit(self, entry, now):
+        """``DEFERRED`` if ``entry`` is still held back by its quota, else ``None``; call with the lock held."""
+        entry_id = entry['id']
+        ready_at = self._deferred.get(entry_id)
+        if ready_at is None:
+            # over quota already: do not queue it only to defer it when a worker gets to it
+            wait = self.quotas.delay(entry, now)
+            if not wait:
+                return None
+            self._defer(entry_id, now + wait)
+            return DEFERRED
+        if ready_at > now:
+            return DEFERRED
+        self._forget(entry_id)
+        return None
+
+    def due_deferred(self, now=None):
+        """Ids of deferred entries whose quota has freed up, oldest first; they wait to be submitted again."""
+        now = time.time() if now is None else now
+        with self._cond:
+            return sorted(entry_id for entry_id, ready_at in self._deferred.items() if ready_at <= now)
+
+    def backlog(self, now=None):
+        """Entries waiting for a worker, counting deferred ones only once their quota has freed up."""
+        now = time.time() if now is None else now
+        with self._cond:
+            return len(self._pending) + sum(1 for ready_at in self._deferred.values() if ready_at <= now)
+
+    def forget_deferred(self, entry_id):
+        """Stop tracking a deferred entry that no longer needs processing (read or deleted meanwhile)."""
+        with self._cond:
+            self._forget(entry_id)
+
+    def _forget(self, entry_id):
+        if self._deferred.pop(entry_id, None) is not None:
+            self._conn.execute('DELETE FROM deferred WHERE entry_id = ?', (entry_id,))
+
+    def wait_replayed(self, timeout=None):
+        """Block until the entries replayed from the previous run are processed (or deferred)."""
+        with self._cond:
+            futures = [self._futures[entry_id] for entry_id in self.replayed if entry_id in self._futures]
+        concurrent.futures.wait(futures, timeout)
+        return len(futures)
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'depth': len(self._pending),
+                'deferred': len(self._deferred),
+                'in_flight': [
+                    {'entry_id': entry_id, 'source': source, 'running_for': round(now - started, 2)}
+                    for entry_id, (source, started) in self._in_flight.items()
+                ],
+                'processed': self.processed,
+                'failed': self.failed,
+            }
+
+    def _take(self):
+        with self._cond:
+            while True:
+                now = time.time()
+                blocked = []
+                chosen = None
+                while self._heap:
+                    item = heapq.heappop(self._heap)
+                    key, _, entry_id = item
+                    queued = self._pending.get(entry_id)
+                    # Stale heap slots are left behind when an entry is re-prioritized.
+                    if queued is None or queued[3] != key:
+                        continue
+                    wait = self.quotas.delay(queued[0], now)
+                    if wait == 0:
+                        chosen = entry_id
+                        break
+                    if wait is None:
+                        blocked.append(item)
+                    else:
+                        self._drop(entry_id)
+                        self._defer(entry_id, now + wait)
+                for item in blocked:
+                    heapq.heappush(self._heap, item)
+
+                if chosen is not None:
+                    break
+                self._cond.wait()
+
+            entry, source, _, _ = self._pending.pop(chosen)
+            self.quotas.acquire(entry, now)
+            self._in_flight[chosen] = (source, now)
+            return chosen, entry, source, self._futures[chosen]
+
+    def _defer(self, entry_id, ready_at):
+        self._deferred[entry_id] = ready_at
+        self._conn.execute('INSERT OR REPLACE INTO deferred VALUES (?, ?)', (entry_id, ready_at))
+        QUEUE_DEFERRED.inc()
+        logger.debug('Entry %s deferred by quota for %.0fs', entry_id, ready_at - time.time())
+
+    def _drop(self, entry_id):
+        """Remove a queued entry that is deferred after all; call with the lock held."""
+        del self._pending[entry_id]
+        self._conn.execute('DELETE FROM queue WHERE entry_id = ?', (entry_id,))
+        # its lease is no longer renewed and simply expires
+        self._futures.pop(entry_id).set_result(DEFERRED)
+
+    def _run(self):
+        while True:
+            entry_id, entry, source, future = self._take()
+            future.set_running_or_notify_cancel()
+            try:
+                result = self.handler(entry)
+            except Exception as exc:
+                error = exc
+                logger.error('Queued entry failed | entry_id=%s | source=%s', entry_id, source)
+                logger.debug('Queued entry traceback', exc_info=exc)
+            else:
+                error = None
+
+            if self.leases:
+                # failed entries are left for whichever replica polls them next
+                try:
+                    self.leases.release(entry_id, self.owner, done=error is None)
+                except Exception as exc:
+                    # the lease expires on its own; the entry must still be settled here
+                    logger.warning('Failed to release lease of entry %s: %s', entry_id, exc)
+
+            with self._cond:
+                self.quotas.release(entry)
+                self._cond.notify_all()
+                # Failed entries are dropped as well: the poller will pick them up
+                # again because the ledger has no record of them.
+                self._conn.execute('DELETE FROM queue WHERE entry_id = ?', (entry_id,))
+                del self._in_flight[entry_id]
+                del self._futures[entry_id]
+                if error is None:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _renew_leases(self):
+        while True:
+            time.sleep(self.lease_ttl / 3)
+            with self._cond:
+                entry_ids = list(self._futures)
+            try:
+                held = self.leases.renew(entry_ids, self.owner, self.lease_ttl)
+            except Exception as exc:
+                logger.warning('Failed to renew entry leases: %s', exc)
+                continue
+            lost = set(entry_ids) - held
+            if lost:
+                logger.warning('Entry leases expired and were taken over | entries=%s', sorted(lost))
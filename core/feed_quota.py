@@ -0,0 +1,64 @@
+import fnmatch
+import re
+from collections import defaultdict, deque
+
+_HOUR = 3600.0
+
+
+class FeedQuotas:
+    """Per-feed and per-category admission limits for the work queue.
+
+    ``feeds`` maps site_url globs and ``categories`` maps category titles to
+    ``{'max_per_hour': n, 'max_concurrent': n}``. A feed glob applies to every
+    matching feed separately; a category limit is shared by the category.
+    Not thread-safe: the work queue calls it under its own lock.
+    """
+
+    def __init__(self, feeds=None, categories=None):
+        self.feed_rules = tuple(
+            (re.compile(fnmatch.translate(pattern)), limits or {}) for pattern, limits in (feeds or {}).items()
+        )
+        self.category_rules = {name: limits or {} for name, limits in (categories or {}).items()}
+        self._started = defaultdict(deque)
+        self._running = defaultdict(int)
+
+    def _scopes(self, entry):
+        feed = entry.get('feed') or {}
+        site_url = feed.get('site_url') or ''
+        scopes = []
+        for pattern, limits in self.feed_rules:
+            if pattern.match(site_url):
+                scopes.append((('feed', site_url), limits))
+                break
+        category = (feed.get('category') or {}).get('title')
+        if category in self.category_rules:
+            scopes.append((('category', category), self.category_rules[category]))
+        return scopes
+
+    def delay(self, entry, now):
+        """Seconds until ``entry`` fits its hourly quota, ``None`` if only concurrency blocks it, else 0."""
+        wait = 0.0
+        blocked = False
+        for scope, limits in self._scopes(entry):
+            max_per_hour = limits.get('max_per_hour')
+            if max_per_hour:
+                started = self._started[scope]
+                while started and started[0] <= now - _HOUR:
+                    started.popleft()
+                if len(started) >= max_per_hour:
+                    wait = max(wait, started[0] + _HOUR - now)
+            max_concurrent = limits.get('max_concurrent')
+            if max_concurrent and self._running[scope] >= max_concurrent:
+                blocked = True
+        if wait > 0:
+            return wait
+        return None if blocked else 0.0
+
+    def acquire(self, entry, now):
+        for scope, _ in self._scopes(entry):
+            self._started[scope].append(now)
+            self._running[scope] += 1
+
+    def release(self, entry):
+        for scope, _ in self._scopes(entry):
+            self._running[scope] -= 1
@@ -1,43 +1,170 @@
 import concurrent.futures
+import itertools
 import time
 
+import miniflux
+
 from common.logger import get_logger
-from core.process_entries import process_entry
+from common.metrics import Counter, Histogram
+from core.entry_filter import get_filter_plan
+from core.entry_ledger import agents_hash
+from core.entry_queue import CLAIMED_ELSEWHERE, DEFERRED
+from core.llm import log_cache_stats
+from core.process_entries import ledger, similarity_index
+from core.work_queue import get_work_queue
 
 logger = get_logger(__name__)
 
+POLL_DURATION = Histogram('miniflux_ai_poll_cycle_duration_seconds', 'Duration of fetch_unread_entries cycles.')
+POLL_ENTRIES = Counter('miniflux_ai_poll_entries_total', 'Unread entries seen by the poller by outcome.', ['result'])
+
+
+def iter_unread_pages(miniflux_client, page_size, after_entry_id=0):
+    """Yield pages of unread entries in ascending id order.
+
+    Paging uses ``after_entry_id`` as a cursor so pages stay stable while
+    earlier entries are being marked read or rewritten by the workers.
+    """
+    cursor = after_entry_id
+    while True:
+        params = {'status': ['unread'], 'limit': page_size, 'order': 'id', 'direction': 'asc'}
+        if cursor:
+            params['after_entry_id'] = cursor
+        page = miniflux_client.get_entries(**params)
+        entries = page.get('entries') or []
+        if not entries:
+            return
+
+        logger.debug('Fetched unread page | size=%s | after_entry_id=%s', len(entries), cursor)
+        yield entries
+
+        if len(entries) < page_size:
+            return
+        cursor = entries[-1]['id']
+
+
+def fetch_due_deferred(miniflux_client, work_queue):
+    """Unread entries the work queue deferred by quota and whose quota has freed up since.
+
+    The poll cursor moves past deferred entries, so they are fetched one by
+    one instead of re-reading the backlog above them.
+    """
+    entries = []
+    for entry_id in work_queue.due_deferred():
+        try:
+            entry = miniflux_client.get_entry(entry_id)
+        except miniflux.ResourceNotFound:
+            entry = None
+        except Exception as exc:
+            logger.warning('Failed to fetch deferred entry %s; retrying next cycle: %s', entry_id, exc)
+            continue
+        if entry is None or entry.get('status') != 'unread':
+            work_queue.forget_deferred(entry_id)
+        else:
+            entries.append(entry)
+    return entries
+
+
 def fetch_unread_entries(config, miniflux_client):
     start_time = time.time()
     logger.info('Task fetch_unread_entries started')
-    entries = miniflux_client.get_entries(status=['unread'], limit=10000)
-    unread_entries = entries.get('entries', [])
-    total = len(unread_entries)
-
-    if total == 0:
-        logger.info('No unread entries found')
-        return
-
-    logger.info('Fetched %s unread entries (limit=10000)', total)
+    fetched = 0
+    skipped = 0
     processed = 0
     failed = 0
+    deferred = 0
+    remote = 0
+    failed_ids = []
+    highest_id = 0
+
+    # The cursor is scoped to the agent definitions so that adding or editing an
+    # agent triggers a full sweep of the unread backlog again.
+    cursor_name = f'poll:{agents_hash(config.agents)}'
+    after_entry_id = ledger.get_cursor(cursor_name) if config.miniflux_incremental_fetch else 0
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=config.llm_max_workers) as executor:
-        futures = {executor.submit(process_entry, miniflux_client, entry): entry for entry in unread_entries}
-        for future in concurrent.futures.as_completed(futures):
-            entry = futures[future]
+    def collect(done):
+        nonlocal processed, failed, deferred, remote
+        for future in done:
+            entry = pending.pop(future)
             try:
-                future.result()
-                processed += 1
+                if future.result() is CLAIMED_ELSEWHERE:
+                    remote += 1
+                    # settled in a later cycle once the other replica finishes (or gives up on) it
+                    failed_ids.append(entry['id'])
+                elif future.result() is DEFERRED:
+                    # the queue remembers it; fetch_due_deferred brings it back once its quota frees
+                    deferred += 1
+                else:
+                    processed += 1
             except Exception as exc:
                 failed += 1
+                failed_ids.append(entry['id'])
                 entry_title = entry.get('title', 'unknown')
                 logger.error('Entry processing failed | title="%s" | id=%s', entry_title, entry.get('id'))
                 logger.debug('Entry processing traceback', exc_info=exc)
 
+    pending = {}
+    work_queue = get_work_queue(miniflux_client)
+    filter_plan = get_filter_plan(config)
+    all_skipped = {name: (agent_config, 'skipped') for name, agent_config in config.agents.items()}
+    all_remote = {name: (agent_config, 'replica') for name, agent_config in config.agents.items()}
+    retried = fetch_due_deferred(miniflux_client, work_queue)
+    pages = iter_unread_pages(miniflux_client, config.miniflux_page_size, after_entry_id)
+    for page in itertools.chain([retried] if retried else [], pages):
+        fetched += len(page)
+        highest_id = max(highest_id, page[-1]['id'])
+        todo = ledger.unhandled(page, config.agents)
+        skipped += len(page) - len(todo)
+        if work_queue.leases:
+            finished = work_queue.leases.finished([entry['id'] for entry in todo])
+            for entry in todo:
+                if entry['id'] in finished:
+                    ledger.record(entry, all_remote)
+            todo = [entry for entry in todo if entry['id'] not in finished]
+            skipped += len(finished)
+        selected = filter_plan.classify(todo)
+        for entry in todo:
+            if not selected[entry['id']]:
+                # No agent applies; settle it here instead of occupying a worker.
+                ledger.record(entry, all_skipped)
+                skipped += 1
+                continue
+            # Keep at most queue_size entries in memory; the next page is
+            # only requested once the workers have drained enough of it.
+            while len(pending) >= config.llm_queue_size:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+            pending[work_queue.submit(entry, 'poll')] = entry
+
+    collect(concurrent.futures.as_completed(list(pending)))
+
+    if fetched == 0:
+        logger.info('No unread entries found | after_entry_id=%s', after_entry_id)
+        return {'fetched': 0}
+
+    # Never move the cursor past an entry that failed or is left to another replica, so it is retried next cycle.
+    next_cursor = min(failed_ids) - 1 if failed_ids else highest_id
+    if config.miniflux_incremental_fetch and next_cursor > after_entry_id:
+        ledger.set_cursor(cursor_name, next_cursor)
+
     duration = time.time() - start_time
+    POLL_DURATION.observe(duration)
+    for result, count in (('fetched', fetched), ('skipped', skipped), ('processed', processed),
+                          ('deferred', deferred), ('remote', remote), ('failed', failed)):
+        POLL_ENTRIES.inc(count, result=result)
     logger.info(
-        'Task fetch_unread_entries finished | processed=%s | failed=%s | duration=%.2fs',
+        'Task fetch_unread_entries finished | fetched=%s | skipped=%s | processed=%s | deferred=%s | remote=%s '
+        '| failed=%s | duration=%.2fs',
+        fetched,
+        skipped,
         processed,
+        deferred,
+        remote,
         failed,
         duration,
     )
+    log_cache_stats()
+    similarity_index.prune()
+    if work_queue.leases:
+        work_queue.leases.prune()
+    return {'fetched': fetched, 'processed': processed, 'deferred': deferred, 'remote': remote, 'failed': failed}
@@ -1,51 +1,217 @@
 import json
+import os
+import threading
 import time
 from textwrap import shorten
 
 from common.config import Config
 from common.logger import get_logger
-from core.get_ai_result import get_ai_result
+from common.metrics import Counter, Histogram
+from common.storage import data_path, shared_path
+from common.tokens import split_by_budget
+from core.ai_news_feed import AINewsFeed
+from core.get_ai_result import get_ai_result, submit_ai_result
+from core.llm import log_cache_stats
+from core.process_entries import summary_store
+from core.similarity import collapse_duplicates
 
 config = Config()
 logger = get_logger(__name__)
+DIGEST_DURATION = Histogram(
+    'miniflux_ai_digest_duration_seconds', 'Duration of generate_daily_news runs.',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200),
+)
+DIGEST_ITEMS = Counter('miniflux_ai_digest_items_total', 'Summaries folded into published digests.')
+DIGEST_CHUNKS = Counter('miniflux_ai_digest_chunks_total', 'Map-stage chunks sent to the LLM for digests.')
+DIGEST_FOLD_DURATION = Histogram(
+    'miniflux_ai_digest_fold_duration_seconds', 'Duration of incremental digest folds.',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+ai_news_feed = AINewsFeed(data_path(config, 'ai_news.json'), keep=config.ai_news_keep)
+# running per-category digests of the incremental mode; next to the summaries they are folded from
+digest_state_path = shared_path(config, 'digest_state.json')
+_digest_lock = threading.Lock()
 
 
 def _preview(text: str) -> str:
     return shorten(text.replace('\n', ' ').strip(), width=160, placeholder='…')
 
+def _by_category(records):
+    by_category = {}
+    for record in records:
+        by_category.setdefault(record.get('category') or 'Uncategorized', []).append(record['content'])
+    return by_category
+
+
+def _category_chunks(records, budget):
+    """Split summaries by category first, then by token budget within each category."""
+    for category, contents in _by_category(records).items():
+        for chunk in split_by_budget(contents, budget):
+            yield f'Category: {category}\n' + '\n'.join(chunk)
+
+
+def _map_reduce(prompt, chunks, budget):
+    """Run ``prompt`` over every chunk in parallel, then fold the partial results level by level."""
+    texts = list(chunks)
+    level = 0
+    while True:
+        futures = [submit_ai_result(prompt, text) for text in texts]
+        texts = [future.result() for future in futures]
+        logger.debug('Digest level %s reduced to %s partial(s)', level, len(texts))
+        if len(texts) == 1:
+            return texts[0]
+
+        groups = split_by_budget(texts, budget)
+        if len(groups) == len(texts):
+            # Partials are too large to merge by budget; pair them so every level halves the work.
+            groups = [texts[i:i + 2] for i in range(0, len(texts), 2)]
+        texts = ['\n'.join(group) for group in groups]
+        level += 1
+
+
+def _fold_category(prompt, category, previous, contents, budget):
+    """Merge new summaries of a category into its running digest, in a single call when they fit."""
+    chunks = [f'Category: {category}\n' + '\n'.join(chunk) for chunk in split_by_budget(contents, budget)]
+    DIGEST_CHUNKS.inc(len(chunks))
+    if previous is None:
+        return _map_reduce(prompt, chunks, budget)
+    previous = f'Category: {category}\n{previous}'
+    if len(split_by_budget([previous] + chunks, budget)) > 1:
+        chunks = [_map_reduce(prompt, chunks, budget)]
+    return get_ai_result(prompt, '\n'.join([previous] + chunks))
+
+
+def _load_digest_state():
+    try:
+        with open(digest_state_path, 'r', encoding='utf8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'categories': {}, 'items': 0, 'fingerprints': [], 'folded': []}
+
+
+def _save_digest_state(state):
+    temporary = digest_state_path + '.tmp'
+    with open(temporary, 'w', encoding='utf8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temporary, digest_state_path)
+
+
+def fold_daily_news():
+    """Fold the summaries collected since the last fold into the running per-category digests."""
+    try:
+        with _digest_lock, DIGEST_FOLD_DURATION.time():
+            return _fold_daily_news()
+    except Exception as exc:
+        # unfolded batches stay in the summary store and are retried by the next fold
+        logger.error('Failed to fold summaries into the running digest: %s', exc, exc_info=exc)
+
+
+def _fold_daily_news():
+    state = _load_digest_state()
+    batches = summary_store.rotate()
+    # batches already folded by a run that died before discarding them are not folded twice
+    folded = set(state['folded'])
+    pending = [batch for batch in batches if os.path.basename(batch) not in folded]
+    records = list(summary_store.iter_records(pending))
+    if config.dedup_enabled:
+        # also drop stories that were folded earlier today under another feed
+        known = [{'simhash': fingerprint, 'known': True} for fingerprint in state['fingerprints']]
+        records = [
+            record for record in collapse_duplicates(known + records, config.dedup_max_distance)
+            if not record.get('known')
+        ]
+        state['fingerprints'] += [record['simhash'] for record in records if record.get('simhash')]
+
+    for category, contents in _by_category(records).items():
+        state['categories'][category] = _fold_category(
+            config.ai_news_prompts['summary_block'],
+            category,
+            state['categories'].get(category),
+            contents,
+            config.ai_news_chunk_tokens,
+        )
+    state['items'] += len(records)
+    state['folded'] = [os.path.basename(batch) for batch in batches]
+    _save_digest_state(state)
+    summary_store.discard(batches)
+    if records:
+        logger.info('Folded summaries into the running digest | new=%s | total=%s | categories=%s',
+                    len(records), state['items'], len(state['categories']))
+    return state
+
+
 def generate_daily_news(miniflux_client):
+    with DIGEST_DURATION.time():
+        if config.ai_news_incremental:
+            return _publish_incremental_news(miniflux_client)
+        return _generate_daily_news(miniflux_client)
+
+
+def _publish_incremental_news(miniflux_client):
+    logger.info('Publishing incremental daily news digest')
+    with _digest_lock:
+        # pick up whatever arrived since the last fold; usually a handful of summaries
+        with DIGEST_FOLD_DURATION.time():
+            state = _fold_daily_news()
+        if not state['items']:
+            logger.info('No cached summaries available for AI news generation')
+            return []
+
+        greeting_future = submit_ai_result(config.ai_news_prompts['greeting'], time.strftime('%B %d, %Y at %I:%M %p'))
+        category_digests = [f'Category: {category}\n{digest}' for category, digest in state['categories'].items()]
+        summary_block = _map_reduce(
+            config.ai_news_prompts['summary_block'],
+            ['\n\n'.join(group) for group in split_by_budget(category_digests, config.ai_news_chunk_tokens)],
+            config.ai_news_chunk_tokens,
+        )
+        _publish(greeting_future, summary_block, state['items'])
+        _save_digest_state({'categories': {}, 'items': 0, 'fingerprints': [], 'folded': state['folded']})
+    _refresh_ai_news_feed(miniflux_client)
+
+
+def _generate_daily_news(miniflux_client):
     logger.info('Generating daily news digest')
-    # fetch entries.json
-    try:
-        with open('entries.json', 'r') as f:
-            entries = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning('entries.json missing or empty; skipping AI news generation')
-        return []
+    # take the summaries collected so far; new ones keep appending to a fresh file
+    batches = summary_store.rotate()
+    records = list(summary_store.iter_records(batches))
+    if config.dedup_enabled:
+        # the same story syndicated by several feeds is listed once
+        records = list(collapse_duplicates(records, config.dedup_max_distance))
+    items = len(records)
 
-    if not entries:
+    if not items:
         logger.info('No cached summaries available for AI news generation')
+        summary_store.discard(batches)
         return []
 
-    contents = '\n'.join([i['content'] for i in entries])
-    # greeting
-    greeting = get_ai_result(config.ai_news_prompts['greeting'], time.strftime('%B %d, %Y at %I:%M %p'))
-    # summary_block
-    summary_block = get_ai_result(config.ai_news_prompts['summary_block'], contents)
+    # greeting, independent of the summaries so it runs alongside them
+    greeting_future = submit_ai_result(config.ai_news_prompts['greeting'], time.strftime('%B %d, %Y at %I:%M %p'))
+    # summary_block, mapped over category chunks and reduced hierarchically
+    chunks = list(_category_chunks(records, config.ai_news_chunk_tokens))
+    logger.info('Digest input split | items=%s | chunks=%s', items, len(chunks))
+    DIGEST_CHUNKS.inc(len(chunks))
+    summary_block = _map_reduce(config.ai_news_prompts['summary_block'], chunks, config.ai_news_chunk_tokens)
+    _publish(greeting_future, summary_block, items)
+    # the rotated batches are only dropped once the digest is published
+    summary_store.discard(batches)
+    _refresh_ai_news_feed(miniflux_client)
+
+
+def _publish(greeting_future, summary_block, items):
     # summary
     summary = get_ai_result(config.ai_news_prompts['summary'], summary_block)
+    greeting = greeting_future.result()
 
     response_content = greeting + '\n\n### 🌐Summary\n' + summary + '\n\n### 📝News\n' + summary_block
 
-    logger.info('Daily news compiled | items=%s | preview="%s"', len(entries), _preview(response_content))
+    logger.info('Daily news compiled | items=%s | preview="%s"', items, _preview(response_content))
+    log_cache_stats()
 
-    # empty entries.json
-    with open('entries.json', 'w') as f:
-        json.dump([], f, indent=4, ensure_ascii=False)
+    ai_news_feed.publish(response_content)
+    DIGEST_ITEMS.inc(items)
 
-    with open('ai_news.json', 'w') as f:
-        json.dump(response_content, f, indent=4, ensure_ascii=False)
 
+def _refresh_ai_news_feed(miniflux_client):
     # trigger miniflux feed refresh
     feeds = miniflux_client.get_feeds()
     ai_news_feed_id = next((item['id'] for item in feeds if 'Newsᴬᴵ for you' in item['title']), None)
@@ -1,20 +1,21 @@
+import time
 from textwrap import shorten
 
-from openai import OpenAI
-
-from common.config import Config
 from common.logger import get_logger
+from common.metrics import Histogram
+from core.llm import submit_chat_completion
 
-config = Config()
-llm_client = OpenAI(base_url=config.llm_base_url, api_key=config.llm_api_key)
 logger = get_logger(__name__)
 
+AI_HELPER_DURATION = Histogram('miniflux_ai_helper_duration_seconds', 'Latency of get_ai_result helper prompts.', ['status'])
+
 
 def _preview(text: str) -> str:
     return shorten(text.replace('\n', ' ').strip(), width=120, placeholder='…')
 
 
-def get_ai_result(prompt, request):
+def submit_ai_result(prompt, request):
+    """Queue a helper prompt on the shared LLM router and return a future of the answer."""
     logger.debug('Executing AI helper prompt | preview="%s"', _preview(prompt))
     messages = [
         {
@@ -26,17 +27,18 @@ def get_ai_result(prompt, request):
             "content": request + "\n---\n" + prompt
         }
     ]
+    return submit_chat_completion(messages)
 
+
+def get_ai_result(prompt, request):
+    started = time.time()
     try:
-        completion = llm_client.chat.completions.create(
-            model=config.llm_model,
-            messages=messages,
-            timeout=config.llm_timeout
-        )
+        response_content = submit_ai_result(prompt, request).result()
     except Exception as exc:
+        AI_HELPER_DURATION.observe(time.time() - started, status='error')
         logger.error('AI helper prompt failed to execute', exc_info=exc)
         raise
+    AI_HELPER_DURATION.observe(time.time() - started, status='ok')
 
-    response_content = completion.choices[0].message.content
     logger.debug('AI helper prompt completed | preview="%s"', _preview(response_content))
     return response_content
@@ -0,0 +1,119 @@
+import abc
+import threading
+import time
+
+from common.storage import connect
+
+
+class LeaseStore(abc.ABC):
+    """Entry leases shared by every replica, so each entry is processed by exactly one of them.
+
+    A lease is held by one ``owner`` until it expires, is released, or is
+    released as done; done entries keep a tombstone for ``done_retention``
+    seconds so that no replica claims them again. Backends implement the
+    methods below atomically across processes and hosts.
+    """
+
+    @abc.abstractmethod
+    def claim(self, entry_ids, owner, ttl):
+        """Lease the free or expired entries among ``entry_ids``; returns the ids now held by ``owner``."""
+
+    @abc.abstractmethod
+    def renew(self, entry_ids, owner, ttl):
+        """Extend the leases ``owner`` still holds; returns their ids."""
+
+    @abc.abstractmethod
+    def release(self, entry_id, owner, done=False):
+        """Give up a lease, leaving a ``done`` tombstone if the entry was completed."""
+
+    @abc.abstractmethod
+    def finished(self, entry_ids):
+        """Ids among ``entry_ids`` that some replica has already completed."""
+
+    @abc.abstractmethod
+    def prune(self):
+        """Drop expired leases and tombstones older than ``done_retention``."""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Lease store in a SQLite database on a volume shared by replicas running on the same host.
+
+    WAL needs shared memory between the processes, so this backend does not
+    work over network filesystems; replicas on several hosts need another backend.
+    """
+
+    def __init__(self, path, done_retention=7 * 24 * 3600):
+        self.done_retention = done_retention
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS leases ('
+                'entry_id INTEGER PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL, done INTEGER NOT NULL)'
+            )
+
+    def _held(self, entry_ids, owner):
+        placeholders = ','.join('?' * len(entry_ids))
+        return {
+            row[0] for row in self._conn.execute(
+                f'SELECT entry_id FROM leases WHERE owner = ? AND done = 0 AND entry_id IN ({placeholders})',
+                [owner] + list(entry_ids),
+            )
+        }
+
+    def claim(self, entry_ids, owner, ttl):
+        if not entry_ids:
+            return set()
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two replicas cannot both see a lease as free.
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO leases VALUES (?, ?, ?, 0) ON CONFLICT (entry_id) DO UPDATE '
+                    'SET owner = excluded.owner, expires_at = excluded.expires_at '
+                    'WHERE leases.done = 0 AND (leases.owner = excluded.owner OR leases.expires_at < ?)',
+                    [(entry_id, owner, now + ttl, now) for entry_id in entry_ids],
+                )
+                held = self._held(entry_ids, owner)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return held
+
+    def renew(self, entry_ids, owner, ttl):
+        if not entry_ids:
+            return set()
+        placeholders = ','.join('?' * len(entry_ids))
+        with self._lock:
+            self._conn.execute(
+                f'UPDATE leases SET expires_at = ? WHERE owner = ? AND done = 0 AND entry_id IN ({placeholders})',
+                [time.time() + ttl, owner] + list(entry_ids),
+            )
+            return self._held(entry_ids, owner)
+
+    def release(self, entry_id, owner, done=False):
+        with self._lock:
+            if done:
+                self._conn.execute(
+                    'UPDATE leases SET done = 1, expires_at = ? WHERE entry_id = ? AND owner = ?',
+                    (time.time() + self.done_retention, entry_id, owner),
+                )
+            else:
+                self._conn.execute('DELETE FROM leases WHERE entry_id = ? AND owner = ? AND done = 0', (entry_id, owner))
+
+    def finished(self, entry_ids):
+        if not entry_ids:
+            return set()
+        placeholders = ','.join('?' * len(entry_ids))
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute(
+                    f'SELECT entry_id FROM leases WHERE done = 1 AND entry_id IN ({placeholders})', list(entry_ids)
+                )
+            }
+
+    def prune(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM leases WHERE expires_at < ?', (time.time(),))
@@ -0,0 +1,121 @@
+import concurrent.futures
+
+from openai import AsyncOpenAI
+
+from common.config import Config
+from common.logger import get_logger
+from common.metrics import Counter
+from common.storage import data_path
+from core.llm_cache import LLMCache
+from core.llm_dispatcher import LLMDispatcher, PartialResponse
+from core.llm_router import Backend, LLMRouter
+
+config = Config()
+logger = get_logger(__name__)
+
+LLM_CACHE_LOOKUPS = Counter('miniflux_ai_llm_cache_lookups_total', 'LLM response cache lookups.', ['result'])
+
+
+def _check_backends(backends, agents):
+    """Fail at startup, not on every call, when ``llm.backends`` or an agent's ``backend`` pin is wrong."""
+    names = [settings.get('name') for settings in backends]
+    if not all(names):
+        raise ValueError('Every entry of llm.backends needs a name')
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate LLM backend names: {', '.join(duplicates)}")
+    for agent_name, agent_config in agents.items():
+        pinned = agent_config.get('backend')
+        if pinned and pinned not in names:
+            raise ValueError(
+                f"Agent {agent_name} is pinned to unknown LLM backend {pinned} (known: {', '.join(names)})"
+            )
+
+
+def _backend(settings, failover):
+    return Backend(
+        settings['name'],
+        settings.get('model', config.llm_model),
+        LLMDispatcher(
+            AsyncOpenAI(
+                base_url=settings.get('base_url', config.llm_base_url),
+                api_key=settings.get('api_key', config.llm_api_key),
+                # with somewhere to fail over to, retrying the same backend only adds latency
+                **({'max_retries': 0} if failover else {})
+            ),
+            max_in_flight=settings.get('max_in_flight', config.llm_max_in_flight),
+            rpm=settings.get('RPM', config.llm_RPM),
+            tpm=settings.get('TPM', config.llm_TPM),
+            timeout=settings.get('timeout', config.llm_timeout),
+        ),
+        max_in_flight=settings.get('max_in_flight', config.llm_max_in_flight),
+    )
+
+
+_check_backends(config.llm_backends, config.agents)
+router = LLMRouter(
+    [_backend(settings, len(config.llm_backends) > 1) for settings in config.llm_backends],
+    cooldown=config.llm_backend_cooldown,
+)
+
+cache = LLMCache(
+    data_path(config, 'llm_cache.db'),
+    ttl=config.llm_cache_ttl,
+    max_entries=config.llm_cache_size,
+) if config.llm_cache_size else None
+# Answers complete on the dispatcher's event loop; SQLite writes (which may wait
+# on the busy timeout) are handed to this thread instead of stalling the loop.
+_cache_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm-cache') if cache else None
+
+
+def _store(model, messages, content):
+    try:
+        cache.put(model, messages, content)
+    except Exception as exc:
+        logger.warning('Failed to cache LLM response | model=%s | error=%s', model, exc)
+
+
+def submit_chat_completion(messages, backend=None, max_seconds=None, max_output_tokens=None):
+    """Queue a chat completion on the backend router and return a future of the response text.
+
+    Identical requests are answered from the response cache without touching
+    the rate limiters. The budgets default to ``llm.max_seconds`` and
+    ``llm.max_output_tokens``; answers cut short by them are not cached.
+    """
+    # answers are cached under the model that gave them; unpinned requests accept any backend's
+    if cache:
+        for model in router.models(backend):
+            cached = cache.get(model, messages)
+            if cached is not None:
+                break
+        LLM_CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+        if cached is not None:
+            logger.debug('LLM cache hit | model=%s', model)
+            future = concurrent.futures.Future()
+            future.set_result(cached)
+            return future
+
+    def store(model, content):
+        if content and not isinstance(content, PartialResponse):
+            _cache_writer.submit(_store, model, messages, content)
+
+    return router.submit(
+        messages,
+        backend=backend,
+        on_answer=store if cache else None,
+        stream=config.llm_stream,
+        max_seconds=max_seconds or config.llm_max_seconds,
+        max_output_tokens=max_output_tokens or config.llm_max_output_tokens,
+    )
+
+
+def log_cache_stats():
+    if cache:
+        stats = cache.stats()
+        logger.info(
+            'LLM cache stats | hits=%s | misses=%s | hit_ratio=%.2f | size=%s',
+            stats['hits'],
+            stats['misses'],
+            stats['hit_ratio'],
+            stats['size'],
+        )
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import re
+import threading
+import time
+
+from common.storage import connect
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def cache_key(model, messages):
+    """Content address for a chat request: model plus whitespace-normalized messages."""
+    normalized = [
+        {'role': message.get('role'), 'content': _WHITESPACE.sub(' ', message.get('content') or '').strip()}
+        for message in messages
+    ]
+    payload = json.dumps({'model': model, 'messages': normalized}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with a TTL and least-recently-used eviction."""
+
+    def __init__(self, path, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL, '
+                'created_at REAL NOT NULL, last_used REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)')
+            self._size = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def get(self, model, messages):
+        key = cache_key(model, messages)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT content, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row and (not self.ttl or now - row[1] <= self.ttl):
+                self._conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+                self.hits += 1
+                return row[0]
+            if row:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= 1
+            self.misses += 1
+        return None
+
+    def put(self, model, messages, content):
+        key = cache_key(model, messages)
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute(
+                'INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?, ?)', (key, model, content, now, now)
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    'UPDATE responses SET content = ?, created_at = ?, last_used = ? WHERE key = ?',
+                    (content, now, now, key),
+                )
+            self._size += inserted
+            if self._size > self.max_entries:
+                overflow = self._size - self.max_entries
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)',
+                    (overflow,),
+                )
+                self._size -= overflow
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': self._size,
+            }
@@ -0,0 +1,218 @@
+import asyncio
+import threading
+import time
+
+from common.logger import get_logger
+from common.metrics import Counter, Gauge, Histogram
+from common.tokens import estimate_message_tokens, estimate_tokens
+
+logger = get_logger(__name__)
+
+LLM_REQUESTS = Counter('miniflux_ai_llm_requests_total', 'LLM chat completions by outcome.', ['model', 'status'])
+LLM_LATENCY = Histogram('miniflux_ai_llm_request_duration_seconds', 'LLM chat completion latency.', ['model'])
+LLM_RATE_LIMIT_WAIT = Histogram(
+    'miniflux_ai_llm_rate_limit_wait_seconds', 'Time LLM requests spent waiting for RPM/TPM budget.', ['model'],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 15, 30, 60),
+)
+LLM_TOKENS = Counter('miniflux_ai_llm_tokens_total', 'Tokens reported by the LLM provider.', ['model'])
+LLM_IN_FLIGHT = Gauge('miniflux_ai_llm_in_flight', 'LLM requests currently being served.')
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    'miniflux_ai_llm_time_to_first_token_seconds', 'Time until the first streamed token arrived.', ['model'],
+)
+LLM_PARTIAL = Counter('miniflux_ai_llm_partial_total', 'Streamed answers cut short by a budget.', ['model', 'reason'])
+
+
+class PartialResponse(str):
+    """Text of a streamed answer that was cut short; ``reason`` is ``'time'`` or ``'tokens'``.
+
+    Partial answers are usable but are never cached or reused as complete ones.
+    """
+
+    def __new__(cls, text, reason):
+        value = super().__new__(cls, text)
+        value.reason = reason
+        return value
+
+    def __reduce__(self):
+        # rebuilt with its reason when sent to a CPU worker process
+        return PartialResponse, (str(self), self.reason)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    Waiters are served in arrival order and sleep on the event loop instead of
+    blocking a thread. Must only be used from the dispatcher's loop.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        """Take ``amount`` tokens, waiting as long as needed; returns the seconds waited."""
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return time.monotonic() - started
+
+    def adjust(self, amount):
+        """Charge (or refund, if negative) the difference between estimated and actual usage."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LLMDispatcher:
+    """Process-wide async gateway enforcing in-flight, RPM and TPM budgets for every caller.
+
+    The dispatcher owns an event loop running in a daemon thread; synchronous
+    code hands work over with :meth:`submit` and waits on the returned future.
+    """
+
+    def __init__(self, client, max_in_flight, rpm=None, tpm=None, timeout=60):
+        self.client = client
+        self.timeout = timeout
+        self._in_flight = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='llm-dispatcher', daemon=True)
+        self._thread.start()
+        self._semaphore, self._rpm, self._tpm = asyncio.run_coroutine_threadsafe(
+            self._init_limits(max_in_flight, rpm, tpm), self._loop
+        ).result()
+
+    @staticmethod
+    async def _init_limits(max_in_flight, rpm, tpm):
+        return (
+            asyncio.Semaphore(max_in_flight),
+            TokenBucket(rpm) if rpm else None,
+            TokenBucket(tpm) if tpm else None,
+        )
+
+    def submit(self, model, messages, stream=False, max_seconds=None, max_output_tokens=None):
+        """Schedule a chat completion; returns a ``concurrent.futures.Future`` of the response text.
+
+        With ``stream`` the answer is consumed incrementally and, once
+        ``max_seconds`` or ``max_output_tokens`` is exceeded, whatever arrived so
+        far is returned as a :class:`PartialResponse`.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._complete(model, messages, stream, max_seconds, max_output_tokens), self._loop
+        )
+
+    async def _complete(self, model, messages, stream=False, max_seconds=None, max_output_tokens=None):
+        estimated = estimate_message_tokens(messages)
+        waited = 0.0
+        if self._rpm:
+            waited += await self._rpm.acquire(1)
+        if self._tpm:
+            waited += await self._tpm.acquire(estimated)
+        LLM_RATE_LIMIT_WAIT.observe(waited, model=model)
+        if waited > 0.01:
+            logger.debug('LLM request waited %.2fs for rate limits | model=%s', waited, model)
+
+        async with self._semaphore:
+            self._in_flight += 1
+            LLM_IN_FLIGHT.set(self._in_flight)
+            started = time.monotonic()
+            try:
+                if stream:
+                    return await self._stream(model, messages, started, max_seconds, max_output_tokens)
+                # Without streaming a blown time budget loses the whole answer.
+                completion = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        timeout=self.timeout,
+                        **({'max_tokens': max_output_tokens} if max_output_tokens else {})
+                    ),
+                    max_seconds,
+                )
+            except Exception:
+                LLM_REQUESTS.inc(model=model, status='error')
+                raise
+            finally:
+                self._in_flight -= 1
+                LLM_IN_FLIGHT.set(self._in_flight)
+                LLM_LATENCY.observe(time.monotonic() - started, model=model)
+        LLM_REQUESTS.inc(model=model, status='ok')
+
+        usage = getattr(completion, 'usage', None)
+        if usage is not None and usage.total_tokens:
+            LLM_TOKENS.inc(usage.total_tokens, model=model)
+            if self._tpm:
+                self._tpm.adjust(usage.total_tokens - estimated)
+        choice = completion.choices[0]
+        if getattr(choice, 'finish_reason', None) == 'length' and max_output_tokens:
+            LLM_PARTIAL.inc(model=model, reason='tokens')
+            return PartialResponse(choice.message.content or '', 'tokens')
+        return choice.message.content or ''
+
+    async def _stream(self, model, messages, started, max_seconds, max_output_tokens):
+        deadline = started + max_seconds if max_seconds else None
+
+        def remaining():
+            return max(0.0, deadline - time.monotonic()) if deadline else None
+
+        response = await asyncio.wait_for(
+            self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=self.timeout,
+                stream=True
+            ),
+            remaining(),
+        )
+        parts = []
+        produced = 0
+        reason = None
+        chunks = aiter(response)
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), remaining())
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    reason = 'time'
+                    break
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ''
+                if delta and not parts:
+                    ttft = time.monotonic() - started
+                    LLM_TIME_TO_FIRST_TOKEN.observe(ttft, model=model)
+                    logger.debug('LLM first token after %.2fs | model=%s', ttft, model)
+                parts.append(delta)
+                produced += estimate_tokens(delta)
+                # Stopping here closes the connection, which aborts generation on the server.
+                if max_output_tokens and produced >= max_output_tokens:
+                    reason = 'tokens'
+                    break
+        finally:
+            await response.close()
+
+        if self._tpm:
+            self._tpm.adjust(produced)
+        text = ''.join(parts)
+        if reason is None:
+            LLM_REQUESTS.inc(model=model, status='ok')
+            return text
+        if not text:
+            raise TimeoutError(f'No tokens streamed within {max_seconds}s')
+        LLM_REQUESTS.inc(model=model, status='partial')
+        LLM_PARTIAL.inc(model=model, reason=reason)
+        logger.warning('LLM answer cut short by %s budget | model=%s | chars=%s', reason, model, len(text))
+        return PartialResponse(text, reason)
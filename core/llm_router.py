@@ -0,0 +1,153 @@
+import concurrent.futures
+import threading
+import time
+
+from common.logger import get_logger
+from common.metrics import Counter, Gauge
+
+logger = get_logger(__name__)
+
+LLM_FAILOVERS = Counter('miniflux_ai_llm_failovers_total', 'LLM requests retried on another backend.', ['backend'])
+LLM_BACKEND_LATENCY = Gauge('miniflux_ai_llm_backend_latency_seconds', 'Smoothed LLM latency per backend.', ['backend'])
+LLM_BACKEND_AVAILABLE = Gauge('miniflux_ai_llm_backend_available', 'Whether a backend is out of cooldown.', ['backend'])
+
+
+class Backend:
+    """One OpenAI-compatible endpoint with its own dispatcher (and therefore its own limits)."""
+
+    def __init__(self, name, model, dispatcher, max_in_flight=1):
+        self.name = name
+        self.model = model
+        self.dispatcher = dispatcher
+        self.max_in_flight = max_in_flight
+        self.latency = None
+        self.outstanding = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def available(self, now):
+        return now >= self.cooldown_until
+
+    def score(self):
+        # Expected wait: smoothed latency stretched by how busy the backend already is.
+        # Unmeasured backends score zero so each one gets tried.
+        return (self.latency or 0.0) * (1 + self.outstanding / self.max_in_flight)
+
+
+class LLMRouter:
+    """Routes chat completions across backends by observed latency and health.
+
+    Unpinned requests go to the available backend with the lowest score. A
+    failed request moves on to the next backend; a backend that answers 429
+    or fails ``failure_threshold`` times in a row sits out ``cooldown`` seconds.
+    Pinned requests only ever use their backend.
+    """
+
+    def __init__(self, backends, cooldown=30.0, failure_threshold=3, smoothing=0.2):
+        self.backends = {backend.name: backend for backend in backends}
+        self.default = backends[0]
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        for backend in backends:
+            LLM_BACKEND_AVAILABLE.set(1, backend=backend.name)
+
+    def models(self, backend=None):
+        """Models that may answer a request pinned to ``backend`` (any backend if unpinned), primary first."""
+        if backend:
+            return [self.backends[backend].model]
+        return list(dict.fromkeys(backend.model for backend in self.backends.values()))
+
+    def _candidates(self, pinned):
+        if pinned:
+            if pinned not in self.backends:
+                raise ValueError(f'Unknown LLM backend: {pinned}')
+            return [self.backends[pinned]]
+        now = time.time()
+        with self._lock:
+            # cooling-down backends stay at the end as a last resort
+            return sorted(self.backends.values(), key=lambda backend: (not backend.available(now), backend.score()))
+
+    def submit(self, messages, backend=None, on_answer=None, **budgets):
+        """Schedule a chat completion; returns a ``concurrent.futures.Future`` of the response text.
+
+        ``on_answer(model, text)`` is called with the model of the backend that
+        actually answered (which differs from the first choice after a failover)
+        before the future resolves.
+        """
+        result = concurrent.futures.Future()
+        self._attempt(result, self._candidates(backend), messages, budgets, on_answer)
+        return result
+
+    def _attempt(self, result, candidates, messages, budgets, on_answer):
+        backend = candidates[0]
+        with self._lock:
+            backend.outstanding += 1
+        started = time.time()
+        future = backend.dispatcher.submit(backend.model, messages, **budgets)
+
+        def done(future):
+            with self._lock:
+                backend.outstanding -= 1
+            if result.cancelled():
+                return
+            error = future.exception() if not future.cancelled() else concurrent.futures.CancelledError()
+            if error is None:
+                self._record_success(backend, time.time() - started)
+                if on_answer:
+                    try:
+                        on_answer(backend.model, future.result())
+                    except Exception as exc:
+                        logger.warning('LLM answer callback failed: %s', exc)
+                result.set_result(future.result())
+                return
+
+            self._record_failure(backend, error)
+            if len(candidates) > 1:
+                LLM_FAILOVERS.inc(backend=candidates[1].name)
+                logger.warning('LLM backend %s failed (%s); failing over to %s', backend.name, error, candidates[1].name)
+                try:
+                    self._attempt(result, candidates[1:], messages, budgets, on_answer)
+                except Exception as exc:
+                    result.set_exception(exc)
+                return
+            result.set_exception(error)
+
+        future.add_done_callback(done)
+
+    def _record_success(self, backend, latency):
+        with self._lock:
+            backend.failures = 0
+            if backend.latency is None:
+                backend.latency = latency
+            else:
+                backend.latency += self.smoothing * (latency - backend.latency)
+        LLM_BACKEND_LATENCY.set(backend.latency, backend=backend.name)
+        LLM_BACKEND_AVAILABLE.set(1, backend=backend.name)
+
+    def _record_failure(self, backend, error):
+        with self._lock:
+            backend.failures += 1
+            rate_limited = getattr(error, 'status_code', None) == 429
+            if not (rate_limited or backend.failures >= self.failure_threshold):
+                return
+            backend.cooldown_until = time.time() + self.cooldown
+        LLM_BACKEND_AVAILABLE.set(0, backend=backend.name)
+        logger.warning(
+            'LLM backend %s cooling down for %.0fs | rate_limited=%s | failures=%s',
+            backend.name, self.cooldown, rate_limited, backend.failures,
+        )
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    'model': backend.model,
+                    'latency': backend.latency,
+                    'outstanding': backend.outstanding,
+                    'available': backend.available(now),
+                }
+                for name, backend in self.backends.items()
+            }
@@ -0,0 +1,48 @@
+import re
+
+import miniflux
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.config import Config
+from common.metrics import Gauge, Histogram
+from common.storage import data_path
+from core.write_back import WriteBack
+
+config = Config()
+
+MINIFLUX_LATENCY = Histogram(
+    'miniflux_ai_miniflux_request_duration_seconds', 'Miniflux API latency.', ['method', 'endpoint', 'status'],
+)
+WRITE_BACK_DEPTH = Gauge('miniflux_ai_write_back_depth', 'Entry updates spooled for Miniflux.')
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def _observe_response(response, *args, **kwargs):
+    path = _NUMERIC_SEGMENT.sub('/{id}', response.request.path_url.split('?', 1)[0])
+    MINIFLUX_LATENCY.observe(
+        response.elapsed.total_seconds(),
+        method=response.request.method,
+        endpoint=path,
+        status=response.status_code,
+    )
+
+
+def _create_client():
+    # One pooled session shared by the poller, webhook, digest and write-back threads
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=config.miniflux_pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.hooks['response'].append(_observe_response)
+    return miniflux.Client(config.miniflux_base_url, api_key=config.miniflux_api_key, session=session)
+
+
+miniflux_client = _create_client()
+write_back = WriteBack(
+    data_path(config, 'write_back.db'),
+    miniflux_client,
+    concurrency=config.miniflux_write_concurrency,
+)
+write_back.start()
+WRITE_BACK_DEPTH.set_function(write_back.depth)
@@ -0,0 +1,109 @@
+import time
+
+from common.logger import get_logger
+from common.metrics import Counter, Gauge
+
+logger = get_logger(__name__)
+
+POLL_INTERVAL = Gauge('miniflux_ai_poll_interval_seconds', 'Current delay between unread entry polls.')
+POLL_SKIPPED = Counter('miniflux_ai_poll_skipped_total', 'Polls skipped because Miniflux reported no changes.')
+
+
+class PollScheduler:
+    """Runs ``poll`` back to back with an interval adapted to the load.
+
+    Cycles never overlap: the next one is only scheduled once the previous one
+    returned. The interval halves (down to ``min_interval``) while the backlog
+    or the number of entries fetched per poll grows, and stretches by half (up to ``max_interval``) while polls find
+    nothing new. If the ``signature`` of Miniflux's feed counters is unchanged,
+    the queue is empty and the last poll left nothing to retry, the fetch is
+    skipped altogether, but never for longer than ``force_after`` seconds.
+
+    ``poll`` returns a dict of counts (``fetched``, ``deferred``, ``remote``,
+    ``failed``) and ``backlog`` the number of entries still waiting to be
+    processed. Deferred entries are tracked by the queue and only count towards
+    the backlog once their quota frees up.
+    """
+
+    def __init__(self, poll, signature=None, backlog=None, interval=60, min_interval=30, max_interval=240,
+                 force_after=3600, clock=time.monotonic):
+        self.poll = poll
+        self.signature = signature
+        self.backlog = backlog or (lambda: 0)
+        self.base_interval = interval
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.force_after = force_after
+        self.clock = clock
+        self._last_signature = None
+        self._last_poll = None
+        self._last_backlog = 0
+        self._last_fetched = 0
+        self._settled = False
+        POLL_INTERVAL.set(self.interval)
+
+    def _current_signature(self):
+        if self.signature is None:
+            return None
+        try:
+            return self.signature()
+        except Exception as exc:
+            logger.warning('Failed to read Miniflux counters; polling anyway: %s', exc)
+            return None
+
+    def cycle(self):
+        """Run (or skip) one poll and adapt the interval; returns ``'polled'``, ``'skipped'`` or ``'failed'``."""
+        now = self.clock()
+        signature = self._current_signature()
+        if (signature is not None and signature == self._last_signature and self._settled
+                and not self.backlog() and now - self._last_poll < self.force_after):
+            POLL_SKIPPED.inc()
+            self._set_interval(self.interval * 1.5)
+            logger.debug('Miniflux counters unchanged; skipping poll | next_in=%.0fs', self.interval)
+            return 'skipped'
+
+        try:
+            result = self.poll() or {}
+        except Exception as exc:
+            logger.error('Poll cycle failed: %s', exc)
+            logger.debug('Poll cycle traceback', exc_info=exc)
+            self._settled = False
+            return 'failed'
+
+        self._last_poll = now
+        self._last_signature = signature
+        # entries left to retry mean the next poll must run even if Miniflux is unchanged
+        self._settled = not (result.get('remote') or result.get('failed'))
+
+        backlog = self.backlog()
+        fetched = result.get('fetched', 0)
+        if backlog > self._last_backlog or fetched > self._last_fetched:
+            self._set_interval(self.interval / 2)
+        elif not fetched:
+            self._set_interval(self.interval * 1.5)
+        elif backlog == 0:
+            # caught up: drift back towards the configured interval
+            self._set_interval((self.interval + self.base_interval) / 2)
+        self._last_backlog = backlog
+        self._last_fetched = fetched
+        logger.info('Next poll in %.0fs | backlog=%s', self.interval, backlog)
+        return 'polled'
+
+    def _set_interval(self, interval):
+        self.interval = max(self.min_interval, min(self.max_interval, interval))
+        POLL_INTERVAL.set(self.interval)
+
+    def run_forever(self, sleep=time.sleep):
+        while True:
+            self.cycle()
+            sleep(self.interval)
+
+
+def counters_signature(miniflux_client):
+    """Per-feed read and unread counts; any new or newly read entry changes them."""
+    counters = miniflux_client.get_feed_counters()
+    return (
+        tuple(sorted((counters.get('reads') or {}).items())),
+        tuple(sorted((counters.get('unreads') or {}).items())),
+    )
@@ -0,0 +1,29 @@
+import re
+
+from markdownify import markdownify as md
+
+from core.similarity import simhash
+
+_BOILERPLATE = re.compile(
+    r'<(script|style|svg|noscript|iframe|template)\b.*?</\1\s*>|<!--.*?-->',
+    re.IGNORECASE | re.DOTALL,
+)
+_DATA_URI = re.compile(r'''\s(?:src|href|srcset)\s*=\s*(["'])data:.*?\1''', re.IGNORECASE | re.DOTALL)
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def clean_html(content):
+    """Drop markup that carries no meaning for the LLM: scripts, styles, inline SVG and data URIs."""
+    content = _BOILERPLATE.sub(' ', content or '')
+    return _DATA_URI.sub('', content)
+
+
+def prepare_content(content):
+    """Convert an entry's HTML to compact markdown; done once per entry and shared by all agents."""
+    return _BLANK_LINES.sub('\n\n', md(clean_html(content))).strip()
+
+
+def prepare_entry(content, fingerprint=False):
+    """``prepare_content`` plus, if requested, the SimHash of the result; one worker round trip per entry."""
+    prepared = prepare_content(content)
+    return prepared, simhash(prepared) if fingerprint else None
@@ -1,34 +1,103 @@
-import json
-import threading
+import concurrent.futures
 import time
 from textwrap import shorten
-import html
-
-import markdown
-from markdownify import markdownify as md
-from openai import OpenAI
-from ratelimit import limits, sleep_and_retry
 
 from common.config import Config
 from common.logger import get_logger
-from core.entry_filter import filter_entry
+from common.metrics import Counter, Histogram
+from common.storage import data_path, shared_path
+from common.tokens import truncate_to_budget
+from core.checkpoint_store import CheckpointStore
+from core.cpu_pool import CPUPool
+from core.entry_filter import get_filter_plan
+from core.entry_ledger import EntryLedger, agent_hash, content_hash
+from core.llm import submit_chat_completion
+from core.llm_dispatcher import PartialResponse
+from core.miniflux_client import write_back
+from core.preprocess import prepare_entry
+from core.render import render_entry
+from core.similarity import SimilarityIndex
+from core.summary_store import SummaryStore
 
 config = Config()
-llm_client = OpenAI(base_url=config.llm_base_url, api_key=config.llm_api_key)
-file_lock = threading.Lock()
+ledger = EntryLedger(data_path(config, 'ledger.db'))
+# shared between replicas so the digest sees every replica's summaries
+summary_store = SummaryStore(shared_path(config, 'entries.jsonl'))
+summary_store.import_legacy(data_path(config, 'entries.json'))
+cpu_pool = CPUPool(config.workers_processes)
+checkpoint_store = CheckpointStore(data_path(config, 'checkpoints.db'))
+checkpoint_store.prune()
+similarity_index = SimilarityIndex(
+    data_path(config, 'similarity.db'),
+    max_distance=config.dedup_max_distance,
+    retention=config.dedup_retention,
+)
 logger = get_logger(__name__)
 
+ENTRIES_PROCESSED = Counter('miniflux_ai_entries_processed_total', 'Entries run through the agents.', ['feed', 'status'])
+ENTRY_DURATION = Histogram('miniflux_ai_entry_duration_seconds', 'End-to-end processing time per entry.', ['feed'])
+AGENT_RUNS = Counter('miniflux_ai_agent_runs_total', 'Agent executions by outcome.', ['agent', 'status'])
+AGENT_DURATION = Histogram('miniflux_ai_agent_duration_seconds', 'Time from agent submission to LLM answer.', ['agent'])
+
 
 def _preview(text: str, width: int = 120) -> str:
     cleaned = text.replace('\n', ' ').replace('\r', ' ').strip()
     return shorten(cleaned, width=width, placeholder='…')
 
 
-@sleep_and_retry
-@limits(calls=config.llm_RPM, period=60)
+def _build_messages(agent_prompt, content):
+    if '${content}' in agent_prompt:
+        return [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": agent_prompt.replace('${content}', content)}
+        ]
+    return [
+        {"role": "system", "content": agent_prompt},
+        {"role": "user", "content": "\n---\n " + content}
+    ]
+
+
+def _persist_summary(entry, response_content, fingerprint=None):
+    feed = entry.get('feed', {})
+    entry_list = {
+        'datetime': entry.get('created_at'),
+        'category': feed.get('category', {}).get('title') if feed else None,
+        'title': entry.get('title'),
+        'content': response_content
+    }
+    if fingerprint is not None:
+        entry_list['simhash'] = format(fingerprint, 'x')
+    summary_store.append(entry_list)
+    logger.debug('Persisted summary snapshot for entry %s', entry.get('id'))
+
+
+def _checkpoint(entry_id, source_hash, agent_name, prompt_hash, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    output = future.result()
+    partial = output.reason if isinstance(output, PartialResponse) else None
+    try:
+        checkpoint_store.save(entry_id, source_hash, agent_name, prompt_hash, output, partial)
+    except Exception as exc:
+        logger.warning('Failed to checkpoint agent %s for entry %s: %s', agent_name, entry_id, exc)
+
+
 def process_entry(miniflux_client, entry):
-    # Todo change to queue
-    llm_result = ''
+    feed_title = (entry.get('feed') or {}).get('title') or 'unknown'
+    started = time.time()
+    try:
+        _process_entry(entry)
+    except Exception:
+        ENTRIES_PROCESSED.inc(feed=feed_title, status='failed')
+        raise
+    else:
+        ENTRIES_PROCESSED.inc(feed=feed_title, status='ok')
+    finally:
+        ENTRY_DURATION.observe(time.time() - started, feed=feed_title)
+
+
+def _process_entry(entry):
+    agent_results = {}
     entry_id = entry.get('id')
     feed = entry.get('feed', {})
     feed_title = feed.get('title')
@@ -40,79 +109,134 @@ def process_entry(miniflux_client, entry):
         entry.get('title'),
     )
 
+    # Agents only depend on the entry content, so they are fanned out together
+    # (bounded by llm.agent_parallelism) and assembled in configured order below.
+    futures = {}
+    finished_at = {}
+    agent_start = time.time()
+    # polled entries were already classified by the poller
+    selected = get_filter_plan(config).selection(entry)
+    content, fingerprint = cpu_pool.run(prepare_entry, entry.get('content', ''), config.dedup_enabled) \
+        if selected else ('', None)
+    # Syndicated copies of a story reuse the outputs of the first copy processed.
+    duplicate_of = similarity_index.find(fingerprint, exclude=entry_id) if fingerprint is not None else None
+    reused = set()
+    # Outputs saved before a crash or failure are picked up instead of asking the LLM again.
+    source_hash = content_hash(entry.get('content'))
+    checkpoints = checkpoint_store.load(entry_id, source_hash) if selected else {}
+    resumed = set()
+    # Answers are checkpointed from this thread as they arrive, never from the
+    # dispatcher's event loop, and always before the checkpoints are cleared.
+    unsaved = {}
+
+    def save_checkpoints():
+        for name in [name for name in unsaved if futures[name].done()]:
+            _checkpoint(entry_id, source_hash, name, unsaved.pop(name), futures[name])
+
     for agent_name, agent_config in config.agents.items():
-        agent_prompt = agent_config.get('prompt', '')
-        if not filter_entry(config, (agent_name, agent_config), entry):
+        if agent_name not in selected:
             logger.debug('Agent %s skipped by filters for entry %s', agent_name, entry_id)
+            agent_results[agent_name] = (agent_config, 'skipped')
+            AGENT_RUNS.inc(agent=agent_name, status='skipped')
             continue
 
-        agent_start = time.time()
-        if '${content}' in agent_prompt:
-            messages = [
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": agent_prompt.replace('${content}', md(entry.get('content', '')))}
-            ]
-        else:
-            messages = [
-                {"role": "system", "content": agent_prompt},
-                {"role": "user", "content": "\n---\n " + md(entry.get('content', ''))}
-            ]
+        # resumed and reused agents are already done, so only the running ones are waited on
+        running = [future for future in futures.values() if not future.done()]
+        while len(running) >= config.llm_agent_parallelism:
+            concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            running = [future for future in running if not future.done()]
+            save_checkpoints()
+
+        prompt_hash = agent_hash(agent_config)
+        checkpoint = checkpoints.get(agent_name)
+        if checkpoint is not None and checkpoint[0] == prompt_hash:
+            _, output, partial = checkpoint
+            future = concurrent.futures.Future()
+            future.set_result(PartialResponse(output, partial) if partial else output)
+            futures[agent_name] = future
+            resumed.add(agent_name)
+            continue
+
+        if duplicate_of is not None:
+            output = similarity_index.output(duplicate_of, agent_name, prompt_hash)
+            if output is not None:
+                future = concurrent.futures.Future()
+                future.set_result(output)
+                futures[agent_name] = future
+                reused.add(agent_name)
+                continue
+
+        budget = agent_config.get('max_input_tokens', config.llm_max_input_tokens)
+        messages = _build_messages(agent_config.get('prompt', ''), truncate_to_budget(content, budget))
+        future = submit_chat_completion(
+            messages,
+            backend=agent_config.get('backend'),
+            max_seconds=agent_config.get('max_seconds'),
+            max_output_tokens=agent_config.get('max_output_tokens'),
+        )
+        future.add_done_callback(lambda _, name=agent_name: finished_at.setdefault(name, time.time()))
+        futures[agent_name] = future
+        unsaved[agent_name] = prompt_hash
+
+    for _ in concurrent.futures.as_completed([futures[name] for name in unsaved]):
+        save_checkpoints()
 
+    if reused:
+        logger.info('Entry %s is a near-duplicate of %s; reusing %s', entry_id, duplicate_of, ', '.join(reused))
+    if resumed:
+        logger.info('Entry %s resumed from checkpoints | agents=%s', entry_id, ', '.join(resumed))
+
+    rendered = []
+    outputs = {}
+    for agent_name, future in futures.items():
+        agent_config = config.agents[agent_name]
         try:
-            completion = llm_client.chat.completions.create(
-                model=config.llm_model,
-                messages=messages,
-                timeout=config.llm_timeout
-            )
+            response_content = future.result()
         except Exception as exc:
             logger.error('Agent %s failed to fetch LLM result for entry %s', agent_name, entry_id, exc_info=exc)
+            AGENT_RUNS.inc(agent=agent_name, status='failed')
+            for pending in futures.values():
+                pending.cancel()
             raise
 
-        response_content = completion.choices[0].message.content or ''
-        duration = time.time() - agent_start
-        logger.info(
-            'Agent %s completed entry %s in %.2fs | preview="%s"',
-            agent_name,
-            entry_id,
-            duration,
-            _preview(response_content),
-        )
-
-        if agent_name == 'summary':
-            entry_list = {
-                'datetime': entry.get('created_at'),
-                'category': feed.get('category', {}).get('title') if feed else None,
-                'title': entry.get('title'),
-                'content': response_content
-            }
-            with file_lock:
-                try:
-                    with open('entries.json', 'r') as file:
-                        data = json.load(file)
-                except (FileNotFoundError, json.JSONDecodeError):
-                    data = []
-                data.append(entry_list)
-                with open('entries.json', 'w') as file:
-                    json.dump(data, file, indent=4, ensure_ascii=False)
-            logger.debug('Persisted summary snapshot for entry %s', entry_id)
-
-        if agent_config.get('style_block'):
-            formatted_block = (
-                '<div style="border: 1px solid #e5e7eb; border-radius: 12px; padding: 16px; '
-                'margin: 16px 0; background-color: #f9fafb; box-shadow: inset 0 1px 0 rgba(255, 255, 255, 0.6);">'
-                f'<div style="font-size: 1.05em; font-weight: 600; color: #374151; margin-bottom: 8px;">{agent_config.get("title", "")}</div>'
-                '<pre style="white-space: pre-wrap; font-family: \"SFMono-Regular\", Menlo, Monaco, Consolas, \"Liberation Mono\", \"Courier New\", monospace; '
-                'font-size: 0.96em; line-height: 1.6; color: #1f2937; margin: 0;">\n'
-                f'{html.escape(response_content.strip())}\n'
-                '</pre>'
-                '</div><hr><br />'
-            )
-            llm_result = llm_result + formatted_block
+        partial = isinstance(response_content, PartialResponse)
+        if not partial:
+            # cut-short answers are kept for this entry but not offered to its near-duplicates
+            outputs[agent_name] = (agent_hash(agent_config), response_content)
+        if agent_name in reused:
+            # the original copy already contributed its summary to the digest
+            AGENT_RUNS.inc(agent=agent_name, status='reused')
         else:
-            llm_result = llm_result + f"{agent_config.get('title', '')}{markdown.markdown(response_content)}<hr><br />"
+            if agent_name in resumed:
+                AGENT_RUNS.inc(agent=agent_name, status='resumed')
+            else:
+                agent_duration = finished_at.get(agent_name, time.time()) - agent_start
+                AGENT_RUNS.inc(agent=agent_name, status='partial' if partial else 'done')
+                AGENT_DURATION.observe(agent_duration, agent=agent_name)
+                logger.info(
+                    'Agent %s completed entry %s in %.2fs | preview="%s"',
+                    agent_name,
+                    entry_id,
+                    agent_duration,
+                    _preview(response_content),
+                )
+
+            if agent_name == 'summary':
+                _persist_summary(entry, response_content, fingerprint)
 
+        rendered.append((agent_config, response_content))
+        agent_results[agent_name] = (agent_config, 'done')
+
+    if fingerprint is not None and outputs:
+        similarity_index.add(entry_id, fingerprint, outputs)
+
+    llm_result = cpu_pool.run(render_entry, rendered) if rendered else ''
     if llm_result:
-        miniflux_client.update_entry(entry_id, content=llm_result + entry.get('content', ''))
-        logger.info('Updated Miniflux entry %s with agent output', entry_id)
+        write_back.submit(entry_id, llm_result + entry.get('content', ''))
+        logger.debug('Queued Miniflux update for entry %s', entry_id)
     else:
         logger.debug('No agent produced output for entry %s', entry_id)
+
+    ledger.record(entry, agent_results)
+    # the write-back spool and the ledger now hold everything the checkpoints did
+    checkpoint_store.clear(entry_id)
@@ -0,0 +1,23 @@
+import html
+
+import markdown
+
+
+def render_agent_output(agent_config, response_content):
+    if agent_config.get('style_block'):
+        return (
+            '<div style="border: 1px solid #e5e7eb; border-radius: 12px; padding: 16px; '
+            'margin: 16px 0; background-color: #f9fafb; box-shadow: inset 0 1px 0 rgba(255, 255, 255, 0.6);">'
+            f'<div style="font-size: 1.05em; font-weight: 600; color: #374151; margin-bottom: 8px;">{agent_config.get("title", "")}</div>'
+            '<pre style="white-space: pre-wrap; font-family: \"SFMono-Regular\", Menlo, Monaco, Consolas, \"Liberation Mono\", \"Courier New\", monospace; '
+            'font-size: 0.96em; line-height: 1.6; color: #1f2937; margin: 0;">\n'
+            f'{html.escape(response_content.strip())}\n'
+            '</pre>'
+            '</div><hr><br />'
+        )
+    return f"{agent_config.get('title', '')}{markdown.markdown(response_content)}<hr><br />"
+
+
+def render_entry(outputs):
+    """Render ``(agent_config, response)`` pairs, in order, into the block prepended to an entry."""
+    return ''.join(render_agent_output(agent_config, response_content) for agent_config, response_content in outputs)
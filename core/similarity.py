@@ -0,0 +1,138 @@
+import hashlib
+import re
+import threading
+import time
+
+from common.storage import connect
+
+_TOKEN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]|\w+')
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+def _tokens(text):
+    # CJK is tokenized per character since it has no word separators.
+    return _TOKEN.findall((text or '').lower())
+
+
+def simhash(text, shingle=3, min_tokens=40):
+    """64-bit SimHash over word (or CJK character) shingles; ``None`` for texts too short to compare."""
+    tokens = _tokens(text)
+    if len(tokens) < min_tokens:
+        return None
+
+    weights = [0] * 64
+    for index in range(len(tokens) - shingle + 1):
+        digest = hashlib.blake2b(' '.join(tokens[index:index + shingle]).encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint):
+    return [fingerprint >> (band * _BAND_BITS) & _BAND_MASK for band in range(_BANDS)]
+
+
+def _signed(fingerprint):
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def collapse_duplicates(records, max_distance=3):
+    """Drop records whose ``simhash`` is within ``max_distance`` bits of an earlier record."""
+    buckets = {}
+    for record in records:
+        fingerprint = record.get('simhash')
+        if fingerprint is None:
+            yield record
+            continue
+        fingerprint = int(fingerprint, 16)
+        bands = _bands(fingerprint)
+        if any(hamming(fingerprint, other) <= max_distance
+               for band, value in enumerate(bands) for other in buckets.get((band, value), ())):
+            continue
+        for band, value in enumerate(bands):
+            buckets.setdefault((band, value), []).append(fingerprint)
+        yield record
+
+
+class SimilarityIndex:
+    """SimHash index of recently processed entries and their agent outputs.
+
+    Fingerprints are split into four 16-bit bands; any pair within three bits
+    shares at least one band, so candidates are found with indexed lookups and
+    confirmed by Hamming distance.
+    """
+
+    def __init__(self, path, max_distance=3, retention=48 * 3600):
+        self.max_distance = max_distance
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS fingerprints ('
+                'entry_id INTEGER PRIMARY KEY, simhash INTEGER NOT NULL, '
+                'band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER, created_at REAL NOT NULL)'
+            )
+            for band in range(_BANDS):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS fingerprints_band{band} ON fingerprints (band{band})')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS fingerprints_created ON fingerprints (created_at)')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS outputs ('
+                'entry_id INTEGER NOT NULL, agent_name TEXT NOT NULL, prompt_hash TEXT NOT NULL, output TEXT NOT NULL, '
+                'PRIMARY KEY (entry_id, agent_name, prompt_hash))'
+            )
+
+    def find(self, fingerprint, exclude=None):
+        """Return the id of the closest indexed entry within ``max_distance``, if any."""
+        bands = _bands(fingerprint)
+        where = ' OR '.join(f'band{band} = ?' for band in range(_BANDS))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT entry_id, simhash FROM fingerprints WHERE ({where}) AND created_at >= ?',
+                bands + [time.time() - self.retention],
+            ).fetchall()
+
+        best = None
+        for entry_id, stored in rows:
+            distance = hamming(fingerprint, stored & ((1 << 64) - 1))
+            if entry_id != exclude and distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, entry_id)
+        return best[1] if best else None
+
+    def output(self, entry_id, agent_name, prompt_hash):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT output FROM outputs WHERE entry_id = ? AND agent_name = ? AND prompt_hash = ?',
+                (entry_id, agent_name, prompt_hash),
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, entry_id, fingerprint, outputs):
+        """Index an entry with ``outputs`` mapping agent name to (prompt hash, output)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [entry_id, _signed(fingerprint)] + _bands(fingerprint) + [now],
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)',
+                [(entry_id, name, prompt_hash, output) for name, (prompt_hash, output) in outputs.items()],
+            )
+
+    def prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM outputs WHERE entry_id IN (SELECT entry_id FROM fingerprints WHERE created_at < ?)',
+                (cutoff,),
+            )
+            self._conn.execute('DELETE FROM fingerprints WHERE created_at < ?', (cutoff,))
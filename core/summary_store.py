@@ -0,0 +1,77 @@
+import fcntl
+import glob
+import json
+import os
+import time
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SummaryStore:
+    """Append-only JSON Lines store for agent summaries.
+
+    Appends are a single ``O_APPEND`` write under a shared ``flock``, so worker
+    threads and processes never wait on each other. :meth:`rotate` takes the
+    exclusive lock just long enough to rename the live file aside; consumers then
+    stream the rotated batch and :meth:`discard` it once it has been used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, record):
+        data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                # A rotation may have renamed the file between open and flock.
+                if os.path.exists(self.path) and os.path.samestat(os.fstat(fd), os.stat(self.path)):
+                    os.write(fd, data)
+                    return
+            finally:
+                os.close(fd)
+
+    def rotate(self):
+        """Move the live file aside and return every batch awaiting consumption, oldest first."""
+        if os.path.exists(self.path):
+            rotated = f'{self.path}.{time.time_ns()}'
+            with open(self.path, 'rb') as file:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                os.replace(self.path, rotated)
+        # Batches left behind by a digest that failed are picked up again here.
+        return sorted(glob.glob(glob.escape(self.path) + '.*'))
+
+    @staticmethod
+    def iter_records(paths):
+        for path in paths:
+            with open(path, 'r', encoding='utf8') as file:
+                for line_number, line in enumerate(file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning('Skipping corrupt summary record | file=%s | line=%s', path, line_number)
+
+    @staticmethod
+    def discard(paths):
+        for path in paths:
+            os.remove(path)
+
+    def import_legacy(self, legacy_path):
+        """Fold a pre-JSON-Lines ``entries.json`` array into the store, once."""
+        try:
+            with open(legacy_path, 'r', encoding='utf8') as file:
+                records = json.load(file)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError:
+            records = []
+
+        for record in records or []:
+            self.append(record)
+        os.remove(legacy_path)
+        logger.info('Migrated legacy summaries into %s | count=%s', self.path, len(records or []))
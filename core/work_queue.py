@@ -0,0 +1,42 @@
+import threading
+
+from common.config import Config
+from common.storage import data_path, shared_path
+from core.entry_queue import QUEUE_DEPTH, QUEUE_IN_FLIGHT, EntryQueue
+from core.feed_quota import FeedQuotas
+from core.lease_store import SQLiteLeaseStore
+from core.priority import PriorityPolicy
+from core.process_entries import process_entry
+
+config = Config()
+
+
+_work_queue = None
+_work_queue_lock = threading.Lock()
+
+
+def get_work_queue(miniflux_client=None):
+    """Return the process-wide entry queue, starting it on first use."""
+    global _work_queue
+    with _work_queue_lock:
+        if _work_queue is None:
+            _work_queue = EntryQueue(
+                data_path(config, 'queue.db'),
+                handler=lambda entry: process_entry(miniflux_client, entry),
+                workers=config.llm_max_workers,
+                policy=PriorityPolicy(
+                    poll_delay=config.scheduling_poll_delay,
+                    recency_weight=config.scheduling_recency_weight,
+                    max_delay=config.scheduling_max_delay,
+                    feeds=config.scheduling_feeds,
+                    categories=config.scheduling_categories,
+                ),
+                quotas=FeedQuotas(feeds=config.quota_feeds, categories=config.quota_categories),
+                leases=SQLiteLeaseStore(shared_path(config, 'leases.db')) if config.cluster_shared_dir else None,
+                owner=config.cluster_replica_id,
+                lease_ttl=config.cluster_lease_ttl,
+            )
+            _work_queue.start()
+            QUEUE_DEPTH.set_function(_work_queue.backlog)
+            QUEUE_IN_FLIGHT.set_function(lambda: len(_work_queue._in_flight))
+    return _work_queue
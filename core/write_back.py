@@ -0,0 +1,133 @@
+import random
+import threading
+import time
+
+from common.logger import get_logger
+from common.storage import connect
+
+logger = get_logger(__name__)
+
+_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempts, base=1.0, cap=300.0):
+    """Exponential backoff with jitter: a random delay in [50%, 100%] of ``base * 2**(attempts - 1)``."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+def _is_retryable(exc):
+    # miniflux.ClientError carries the HTTP status; anything without one is a transport error
+    status_code = getattr(exc, 'status_code', None)
+    return status_code is None or status_code in _RETRYABLE_STATUS
+
+
+class WriteBack:
+    """Spooled write-back of agent output to Miniflux.
+
+    Updates are persisted before they are sent, delivered by a small pool of
+    threads sharing the client's pooled HTTP session, and retried with jittered
+    exponential backoff. Whatever is still spooled at shutdown is replayed on the
+    next start instead of re-running the LLM.
+    """
+
+    def __init__(self, path, client, concurrency, base_backoff=1.0, max_backoff=300.0):
+        self.client = client
+        self.concurrency = concurrency
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._in_flight = set()
+        self._conn = connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS updates ('
+            'entry_id INTEGER PRIMARY KEY, content TEXT NOT NULL, attempts INTEGER NOT NULL, due_at REAL NOT NULL)'
+        )
+        for entry_id, content, attempts, due_at in self._conn.execute('SELECT * FROM updates'):
+            self._pending[entry_id] = (content, attempts, due_at)
+        if self._pending:
+            logger.info('Replaying spooled Miniflux updates | count=%s', len(self._pending))
+
+    def start(self):
+        for index in range(self.concurrency):
+            threading.Thread(target=self._run, name=f'write-back-{index}', daemon=True).start()
+
+    def submit(self, entry_id, content):
+        with self._cond:
+            self._conn.execute('INSERT OR REPLACE INTO updates VALUES (?, ?, 0, ?)', (entry_id, content, time.time()))
+            self._pending[entry_id] = (content, 0, time.time())
+            self._cond.notify()
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _take(self):
+        with self._cond:
+            while True:
+                ready = [(due_at, entry_id) for entry_id, (_, _, due_at) in self._pending.items()
+                         if entry_id not in self._in_flight]
+                if not ready:
+                    self._cond.wait()
+                    continue
+                due_at, entry_id = min(ready)
+                delay = due_at - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                self._in_flight.add(entry_id)
+                content, attempts, _ = self._pending[entry_id]
+                return entry_id, content, attempts
+
+    def _run(self):
+        while True:
+            entry_id, content, attempts = self._take()
+            try:
+                self.client.update_entry(entry_id, content=content)
+            except Exception as exc:
+                self._failed(entry_id, content, attempts + 1, exc)
+            else:
+                self._done(entry_id, content)
+                logger.info('Updated Miniflux entry %s with agent output', entry_id)
+
+    def _done(self, entry_id, content):
+        with self._cond:
+            self._in_flight.discard(entry_id)
+            self.sent += 1
+            # A newer update for the same entry may have been spooled meanwhile
+            if self._pending.get(entry_id, (None,))[0] is content:
+                del self._pending[entry_id]
+                self._conn.execute('DELETE FROM updates WHERE entry_id = ?', (entry_id,))
+            self._cond.notify()
+
+    def _failed(self, entry_id, content, attempts, exc):
+        with self._cond:
+            self._in_flight.discard(entry_id)
+            current = self._pending.get(entry_id, (None,))[0]
+            if current is not content:
+                self._cond.notify()
+                return
+            if not _is_retryable(exc):
+                self.dropped += 1
+                del self._pending[entry_id]
+                self._conn.execute('DELETE FROM updates WHERE entry_id = ?', (entry_id,))
+                logger.error('Dropping Miniflux update for entry %s: %s', entry_id, exc)
+                return
+
+            self.retried += 1
+            due_at = time.time() + backoff_delay(attempts, base=self.base_backoff, cap=self.max_backoff)
+            self._pending[entry_id] = (content, attempts, due_at)
+            self._conn.execute(
+                'UPDATE updates SET attempts = ?, due_at = ? WHERE entry_id = ?', (attempts, due_at, entry_id)
+            )
+            self._cond.notify()
+        logger.warning(
+            'Miniflux update failed for entry %s (attempt %s), retrying in %.1fs: %s',
+            entry_id,
+            attempts,
+            due_at - time.time(),
+            exc,
+        )
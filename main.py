@@ -1,39 +1,55 @@
 import concurrent.futures
+import threading
 import time
 
-import miniflux
 import schedule
+from waitress import serve
 
 from common import Config, get_logger
-from myapp import app
-from core import fetch_unread_entries, generate_daily_news
 
 logger = get_logger(__name__)
 
 config = Config()
-miniflux_client = miniflux.Client(config.miniflux_base_url, api_key=config.miniflux_api_key)
-logger.info('Bootstrapping miniflux-ai workers')
-attempt = 0
-
-while True:
-    attempt += 1
-    try:
-        logger.info('Connecting to Miniflux (attempt %s)', attempt)
-        alive = miniflux_client.me()
-        username = alive.get('username') if isinstance(alive, dict) else 'unknown'
-        logger.info('Successfully connected to Miniflux as %s', username)
-        break
-    except Exception as exc:
-        logger.warning('Cannot connect to Miniflux (attempt %s failed): %s', attempt, exc)
-        logger.debug('Miniflux connection traceback', exc_info=exc)
-        time.sleep(3)
+
+
+def connect_miniflux():
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            logger.info('Connecting to Miniflux (attempt %s)', attempt)
+            alive = miniflux_client.me()
+            username = alive.get('username') if isinstance(alive, dict) else 'unknown'
+            logger.info('Successfully connected to Miniflux as %s', username)
+            return
+        except Exception as exc:
+            logger.warning('Cannot connect to Miniflux (attempt %s failed): %s', attempt, exc)
+            logger.debug('Miniflux connection traceback', exc_info=exc)
+            time.sleep(3)
 
 def my_schedule():
-    interval = 15 if config.miniflux_webhook_secret else 1
-    logger.info('Scheduling unread entry polling every %s minute(s)', interval)
-    schedule.every(interval).minutes.do(fetch_unread_entries, config, miniflux_client)
-    schedule.run_all()
-    logger.info('Initial fetch cycle completed')
+    # Resume phase: finish (from their checkpoints) the entries interrupted by the
+    # last shutdown before any new work is fetched.
+    if work_queue.replayed:
+        logger.info('Resuming %s interrupted entries before polling', len(work_queue.replayed))
+        work_queue.wait_replayed()
+        logger.info('Resume phase completed')
+
+    poller = PollScheduler(
+        lambda: fetch_unread_entries(config, miniflux_client),
+        signature=lambda: counters_signature(miniflux_client),
+        backlog=work_queue.backlog,
+        interval=config.scheduling_poll_interval,
+        min_interval=config.scheduling_min_poll_interval,
+        max_interval=config.scheduling_max_poll_interval,
+        force_after=config.scheduling_force_poll_after,
+    )
+    logger.info(
+        'Polling unread entries every %ss, adapting between %ss and %ss',
+        poller.interval, poller.min_interval, poller.max_interval,
+    )
+    # polls run on their own thread so a long cycle never delays the AI news schedule
+    threading.Thread(target=poller.run_forever, name='poller', daemon=True).start()
 
     if config.ai_news_schedule:
         feeds = miniflux_client.get_feeds()
@@ -46,16 +62,33 @@ def my_schedule():
         for ai_schedule in config.ai_news_schedule:
             logger.info('Scheduling AI news generation at %s', ai_schedule)
             schedule.every().day.at(ai_schedule).do(generate_daily_news, miniflux_client)
+        if config.ai_news_incremental:
+            logger.info('Folding summaries into the AI news digest every %s minute(s)', config.ai_news_fold_interval)
+            schedule.every(config.ai_news_fold_interval).minutes.do(fold_daily_news)
 
     while True:
         schedule.run_pending()
         time.sleep(1)
 
 def my_flask():
-    logger.info('Starting API server on 0.0.0.0:80')
-    app.run(host='0.0.0.0', port=80)
+    logger.info('Starting API server on 0.0.0.0:80 | threads=%s', config.workers_http_threads)
+    serve(app, host='0.0.0.0', port=80, threads=config.workers_http_threads)
 
 if __name__ == '__main__':
+    # The application is only imported here: CPU worker processes are spawned and
+    # re-import this module, and must not start the stores and workers again.
+    from core.fetch_unread_entries import fetch_unread_entries
+    from core.generate_daily_news import fold_daily_news, generate_daily_news
+    from core.miniflux_client import miniflux_client
+    from core.poll_scheduler import PollScheduler, counters_signature
+    from core.work_queue import get_work_queue
+    from myapp import app
+
+    logger.info('Bootstrapping miniflux-ai workers')
+    connect_miniflux()
+    # Start the shared worker pool now so entries queued before a restart are replayed.
+    work_queue = get_work_queue(miniflux_client)
+
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
         executor.submit(my_flask)
         executor.submit(my_schedule)
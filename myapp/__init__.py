@@ -1,4 +1,4 @@
 from flask import Flask
 app = Flask(__name__)
 
-from myapp import ai_news, ai_summary, my_swaggerui_blueprint
\ No newline at end of file
+from myapp import ai_news, ai_summary, metrics, my_swaggerui_blueprint
\ No newline at end of file
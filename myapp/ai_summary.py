@@ -1,19 +1,23 @@
-import concurrent.futures
 import hashlib
 import hmac
 
-import miniflux
 from flask import abort, jsonify, request
 
 from common.config import Config
 from common.logger import get_logger
-from core import process_entry
+from common.metrics import Counter
+from core.llm import router
+from core.miniflux_client import miniflux_client, write_back
+from core.process_entries import ledger
+from core.work_queue import get_work_queue
 from myapp import app
 
 config = Config()
-miniflux_client = miniflux.Client(config.miniflux_base_url, api_key=config.miniflux_api_key)
 logger = get_logger(__name__)
 
+WEBHOOK_REQUESTS = Counter('miniflux_ai_webhook_requests_total', 'Webhook calls by response status.', ['status'])
+WEBHOOK_ENTRIES = Counter('miniflux_ai_webhook_entries_total', 'Webhook entries by outcome.', ['result'])
+
 
 @app.route('/api/miniflux-ai', methods=['POST'])
 def miniflux_ai():
@@ -21,13 +25,13 @@ def miniflux_ai():
     publish new feed entries to this API endpoint
     ---
     post:
-      description: Create a random pet
+      description: Queue new feed entries for AI processing
       parameters:
         - in: body
           name: body
           required: True
       responses:
-        200:
+        202:
           content:
             application/json:
               status: string
@@ -40,6 +44,7 @@ def miniflux_ai():
         computed_signature = hmac.new(webhook_secret.encode(), payload, hashlib.sha256).hexdigest()
         if not hmac.compare_digest(computed_signature, signature):
             logger.warning('Rejected webhook with invalid signature')
+            WEBHOOK_REQUESTS.inc(status=403)
             abort(403)
     else:
         logger.warning('Webhook secret not configured; skipping signature validation')
@@ -57,25 +62,36 @@ def miniflux_ai():
     for entry in entry_items:
         entry['feed'] = feed
 
-    failed = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=config.llm_max_workers) as executor:
-        futures = {executor.submit(process_entry, miniflux_client, entry): entry for entry in entry_items}
-        for future in concurrent.futures.as_completed(futures):
-            entry = futures[future]
-            try:
-                future.result()
-            except Exception as exc:
-                failed += 1
-                logger.error(
-                    'Webhook entry processing failed | entry_id=%s | title="%s"',
-                    entry.get('id'),
-                    entry.get('title'),
-                )
-                logger.debug('Webhook entry traceback', exc_info=exc)
+    pending_items = ledger.unhandled(entry_items, config.agents)
+    if len(pending_items) < len(entry_items):
+        logger.info('Webhook entries already handled | skipped=%s', len(entry_items) - len(pending_items))
+
+    work_queue = get_work_queue(miniflux_client)
+    for entry in pending_items:
+        work_queue.submit(entry, 'webhook')
 
-    if failed:
-        logger.warning('Webhook completed with %s failures', failed)
-        return jsonify({'status': 'error', 'failed': failed}), 500
+    logger.info('Webhook entries queued | entries=%s', len(pending_items))
+    WEBHOOK_REQUESTS.inc(status=202)
+    WEBHOOK_ENTRIES.inc(len(pending_items), result='queued')
+    WEBHOOK_ENTRIES.inc(len(entry_items) - len(pending_items), result='skipped')
+    return jsonify({'status': 'accepted', 'queued': len(pending_items)}), 202
 
-    logger.info('Webhook processed successfully | entries=%s', len(entry_items))
-    return jsonify({'status': 'ok'})
+
+@app.route('/api/queue', methods=['GET'])
+def miniflux_ai_queue():
+    """Work queue status
+    queue depth and in-flight entries of the shared worker pool
+    ---
+    get:
+      description: Get work queue status
+      responses:
+        200:
+          content:
+            application/json:
+              status: string
+    """
+    return jsonify(dict(
+        get_work_queue(miniflux_client).stats(),
+        write_back_depth=write_back.depth(),
+        llm_backends=router.stats(),
+    ))
@@ -0,0 +1,20 @@
+from flask import Response
+
+from common.metrics import render_metrics
+from myapp import app
+
+
+@app.route('/metrics', methods=['GET'])
+def miniflux_ai_metrics():
+    """Prometheus metrics
+    pipeline throughput and latency in the Prometheus text format
+    ---
+    get:
+      description: Get Prometheus metrics
+      responses:
+        200:
+          content:
+            text/plain:
+              status: string
+    """
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,63 @@
+"""Imports the application modules that read config.yml on import, against a throw-away config.
+
+Tests of those modules import this first; the modules are loaded once per
+test run, so every such test shares the configuration below.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+WORKDIR = tempfile.mkdtemp(prefix='miniflux-ai-tests-')
+DATA_DIR = os.path.join(WORKDIR, 'data')
+atexit.register(shutil.rmtree, WORKDIR, True)
+
+CONFIG = {
+    'log_level': 'WARNING',
+    # nothing listens on these; tests replace the clients they would reach
+    'miniflux': {'base_url': 'http://127.0.0.1:9', 'api_key': 'test'},
+    'llm': {
+        'base_url': 'http://127.0.0.1:9/v1',
+        'api_key': 'test',
+        'model': 'test-model',
+        'agent_parallelism': 2,
+        'cache_size': 0,
+    },
+    'storage': {'dir': DATA_DIR},
+    'dedup': {'enabled': False},
+    'ai_news': {
+        'url': 'http://127.0.0.1:9',
+        'keep': 3,
+        'prompts': {
+            'greeting': 'Greet the reader.',
+            'summary': 'Summarize the news above.',
+            'summary_block': 'Group the news above by category.',
+        },
+    },
+    'agents': {
+        name: {'title': f'{name}: ', 'prompt': f'Agent {name}.', 'style_block': False}
+        for name in ('first', 'second', 'third', 'fourth')
+    },
+}
+
+os.makedirs(DATA_DIR, exist_ok=True)
+with open(os.path.join(WORKDIR, 'config.yml'), 'w', encoding='utf8') as file:
+    yaml.safe_dump(CONFIG, file, sort_keys=False)
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+_cwd = os.getcwd()
+os.chdir(WORKDIR)
+try:
+    import core.fetch_unread_entries  # noqa: F401
+    import core.generate_daily_news  # noqa: F401
+    import core.process_entries  # noqa: F401
+    import myapp  # noqa: F401
+finally:
+    os.chdir(_cwd)
@@ -0,0 +1,113 @@
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+AI_NEWS_FEED_PATH = PROJECT_ROOT / 'core' / 'ai_news_feed.py'
+
+spec = importlib.util.spec_from_file_location('core.ai_news_feed', AI_NEWS_FEED_PATH)
+ai_news_feed = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ai_news_feed)
+AINewsFeed = ai_news_feed.AINewsFeed
+FEED_URL = ai_news_feed.FEED_URL
+
+
+def _item(index):
+    return {'id': f'{FEED_URL}2024-01-0{index}-08-00', 'title': f'Digest {index}',
+            'description': f'<p>digest {index}</p>', 'published': 1704096000 + index * 86400}
+
+
+class AINewsFeedTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'ai_news.json')
+
+    def test_empty_feed_holds_only_the_welcome_entry(self):
+        xml, etag, last_modified = AINewsFeed(self.path, keep=3).document()
+        self.assertEqual(xml.count(b'<item>'), 1)
+        self.assertIn(b'Welcome to News', xml)
+        self.assertEqual(last_modified.timestamp(), 0)
+
+    def test_publish_keeps_the_last_n_digests_newest_first(self):
+        with open(self.path, 'w', encoding='utf8') as file:
+            json.dump([_item(3), _item(2), _item(1)], file)
+        feed = AINewsFeed(self.path, keep=3)
+        feed.publish('**Fresh** digest')
+
+        with open(self.path, encoding='utf8') as file:
+            items = json.load(file)
+        self.assertEqual([item['title'] for item in items[1:]], ['Digest 3', 'Digest 2'])
+        self.assertIn('<strong>Fresh</strong>', items[0]['description'])
+        xml = feed.document()[0]
+        self.assertEqual(xml.count(b'<item>'), 4)
+        self.assertNotIn(b'digest 1', xml)
+
+    def test_legacy_single_digest_file_is_migrated(self):
+        with open(self.path, 'w', encoding='utf8') as file:
+            json.dump('Legacy *digest*', file)
+        # written by the previous version, a day before the upgrade
+        os.utime(self.path, (time.time() - 86400, time.time() - 86400))
+        feed = AINewsFeed(self.path, keep=3)
+        self.assertIn(b'Legacy &lt;em&gt;digest&lt;/em&gt;', feed.document()[0])
+
+        feed.publish('New digest')
+        with open(self.path, encoding='utf8') as file:
+            items = json.load(file)
+        self.assertEqual(len(items), 2)
+        self.assertIn('<em>digest</em>', items[1]['description'])
+
+    def test_etag_changes_only_when_a_digest_is_published(self):
+        feed = AINewsFeed(self.path, keep=3)
+        first = feed.document()
+        self.assertIs(feed.document(), first)
+
+        # published by another process sharing the file
+        time.sleep(0.01)
+        AINewsFeed(self.path, keep=3).publish('Digest from the scheduler')
+        second = feed.document()
+        self.assertNotEqual(second[1], first[1])
+        self.assertIn(b'Digest from the scheduler', second[0])
+
+
+class AINewsRouteTest(unittest.TestCase):
+    def setUp(self):
+        import app_env  # noqa: F401  (loads the app against a test config)
+        from myapp import app
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.feed = AINewsFeed(os.path.join(tmp.name, 'ai_news.json'), keep=3)
+        patcher = mock.patch('myapp.ai_news.ai_news_feed', self.feed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+
+    def test_conditional_requests_are_answered_with_304(self):
+        self.feed.publish('First digest')
+        response = self.client.get('/rss/ai-news')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/rss+xml')
+        self.assertIn(b'First digest', response.data)
+        etag = response.headers['ETag']
+
+        unchanged = self.client.get('/rss/ai-news', headers={'If-None-Match': etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.data, b'')
+        since = self.client.get('/rss/ai-news', headers={'If-Modified-Since': response.headers['Last-Modified']})
+        self.assertEqual(since.status_code, 304)
+
+        time.sleep(0.01)
+        self.feed.publish('Second digest')
+        changed = self.client.get('/rss/ai-news', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+
+if __name__ == '__main__':
+    unittest.main()
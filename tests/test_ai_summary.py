@@ -0,0 +1,107 @@
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import app_env  # noqa: F401  (loads the app against a test config)
+from core.entry_ledger import EntryLedger
+from core.entry_queue import EntryQueue
+from myapp import ai_summary, app
+
+
+def _payload(*entry_ids):
+    return {
+        'feed': {'id': 1, 'title': 'Feed', 'site_url': 'https://example.com/', 'category': {'title': 'News'}},
+        'entries': [{'id': entry_id, 'title': f'Entry {entry_id}', 'content': f'<p>entry {entry_id}</p>'}
+                    for entry_id in entry_ids],
+    }
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached in time')
+        time.sleep(0.02)
+
+
+class WebhookTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.ledger = EntryLedger(os.path.join(tmp.name, 'ledger.db'))
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.handled = []
+        self.queue = EntryQueue(os.path.join(tmp.name, 'queue.db'), self._handler, workers=1)
+        self.queue.start()
+        for target, value in (
+            ('ledger', self.ledger),
+            ('get_work_queue', lambda miniflux_client: self.queue),
+        ):
+            mock.patch.object(ai_summary, target, value).start()
+        self.addCleanup(mock.patch.stopall)
+        self.client = app.test_client()
+
+    def _handler(self, entry):
+        self.release.wait(5)
+        self.handled.append(entry['id'])
+
+    def _queued(self):
+        stats = self.queue.stats()
+        return stats['depth'] + len(stats['in_flight'])
+
+    def _drain(self):
+        self.release.set()
+        _wait_for(lambda: not self._queued())
+
+    def _post(self, payload, **headers):
+        return self.client.post('/api/miniflux-ai', data=json.dumps(payload), content_type='application/json',
+                                headers=headers)
+
+    def test_entries_are_accepted_before_they_are_processed(self):
+        response = self._post(_payload(1, 2))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json(), {'status': 'accepted', 'queued': 2})
+        self.assertEqual(self.handled, [])
+        self.assertEqual(self._queued(), 2)
+
+    def test_entries_already_in_the_ledger_are_skipped(self):
+        agents = ai_summary.config.agents
+        self.ledger.record({'id': 1, 'content': ''}, {name: (agent, 'done') for name, agent in agents.items()})
+        response = self._post(_payload(1, 2))
+        self.assertEqual(response.get_json()['queued'], 1)
+        self._drain()
+        self.assertEqual(self.handled, [2])
+
+    def test_redelivered_entries_are_queued_once(self):
+        self._post(_payload(1))
+        self._post(_payload(1))
+        self.assertEqual(self._queued(), 1)
+        self._drain()
+        self.assertEqual(self.handled, [1])
+
+    def test_queue_status_reports_the_shared_pool(self):
+        self._post(_payload(1, 2))
+        status = self.client.get('/api/queue').get_json()
+        self.assertEqual(status['workers'], 1)
+        self.assertEqual(status['depth'] + len(status['in_flight']), 2)
+        for key in ('deferred', 'processed', 'failed', 'write_back_depth', 'llm_backends'):
+            self.assertIn(key, status)
+
+    def test_signature_is_checked_when_a_secret_is_configured(self):
+        mock.patch.object(ai_summary.config, 'miniflux_webhook_secret', 'secret').start()
+        payload = _payload(1)
+        self.assertEqual(self._post(payload, **{'X-Miniflux-Signature': 'forged'}).status_code, 403)
+
+        signature = hmac.new(b'secret', json.dumps(payload).encode(), hashlib.sha256).hexdigest()
+        self.assertEqual(self._post(payload, **{'X-Miniflux-Signature': signature}).status_code, 202)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import importlib.util
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CHECKPOINT_STORE_PATH = PROJECT_ROOT / 'core' / 'checkpoint_store.py'
+
+spec = importlib.util.spec_from_file_location('core.checkpoint_store', CHECKPOINT_STORE_PATH)
+checkpoint_store = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(checkpoint_store)
+CheckpointStore = checkpoint_store.CheckpointStore
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'checkpoints.db')
+        self.store = CheckpointStore(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_saved_outputs_survive_reopen(self):
+        self.store.save(7, 'content-a', 'summary', 'agent-a', 'Short summary.')
+        reopened = CheckpointStore(self.path)
+        self.assertEqual(reopened.load(7, 'content-a'), {'summary': ('agent-a', 'Short summary.', None)})
+
+    def test_partial_answers_keep_their_reason(self):
+        self.store.save(7, 'content-a', 'summary', 'agent-a', 'Cut sh', 'tokens')
+        self.assertEqual(self.store.load(7, 'content-a'), {'summary': ('agent-a', 'Cut sh', 'tokens')})
+
+    def test_databases_without_partial_column_are_migrated(self):
+        path = str(Path(self.tmp.name) / 'old.db')
+        conn = sqlite3.connect(path)
+        conn.execute(
+            'CREATE TABLE checkpoints (entry_id INTEGER NOT NULL, agent_name TEXT NOT NULL, prompt_hash TEXT NOT NULL, '
+            'content_hash TEXT NOT NULL, output TEXT NOT NULL, saved_at REAL NOT NULL, PRIMARY KEY (entry_id, agent_name))'
+        )
+        conn.execute("INSERT INTO checkpoints VALUES (7, 'summary', 'agent-a', 'content-a', 'Old.', ?)", (time.time(),))
+        conn.commit()
+        conn.close()
+
+        store = CheckpointStore(path)
+        self.assertEqual(store.load(7, 'content-a'), {'summary': ('agent-a', 'Old.', None)})
+        store.save(8, 'content-b', 'summary', 'agent-a', 'New', 'time')
+        self.assertEqual(store.load(8, 'content-b'), {'summary': ('agent-a', 'New', 'time')})
+
+    def test_changed_content_invalidates_checkpoints(self):
+        self.store.save(7, 'content-a', 'summary', 'agent-a', 'Short summary.')
+        self.assertEqual(self.store.load(7, 'content-b'), {})
+
+    def test_clear_and_prune(self):
+        self.store.save(7, 'content-a', 'summary', 'agent-a', 'Short summary.')
+        self.store.save(8, 'content-b', 'translate', 'agent-b', 'Translated.')
+        self.store.clear(7)
+        self.assertEqual(self.store.load(7, 'content-a'), {})
+        self.assertEqual(self.store.load(8, 'content-b'), {'translate': ('agent-b', 'Translated.', None)})
+
+        self.store.retention = 0
+        time.sleep(0.01)
+        self.store.prune()
+        self.assertEqual(self.store.load(8, 'content-b'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Workers receive the stages (and their initializer) by reference, so these
+# come from the importable modules rather than standalone copies.
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from core.cpu_pool import CPUPool  # noqa: E402
+from core.llm_dispatcher import PartialResponse  # noqa: E402
+from core.preprocess import prepare_entry  # noqa: E402
+from core.render import render_entry  # noqa: E402
+
+
+class CPUPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = CPUPool(1)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_stages_match_inline_results(self):
+        content = '<p>Hello <b>world</b></p><script>track()</script>'
+        rendered = [({'title': 'Summary: ', 'style_block': False}, '**Short** summary.'),
+                    ({'title': 'Notes', 'style_block': True}, 'a < b')]
+
+        self.assertEqual(self.pool.run(prepare_entry, content, True), prepare_entry(content, True))
+        self.assertEqual(self.pool.run(render_entry, rendered), render_entry(rendered))
+
+    def test_partial_answers_survive_the_trip_to_a_worker(self):
+        partial = PartialResponse('Cut *short*', 'time')
+        rendered = [({'title': 'Summary: ', 'style_block': False}, partial)]
+        self.assertEqual(self.pool.run(render_entry, rendered), render_entry(rendered))
+        # the pool is still usable afterwards
+        self.assertEqual(self.pool.run(render_entry, []), '')
+
+    def test_workers_are_not_forked(self):
+        self.pool.run(render_entry, [])
+        self.assertEqual(self.pool._executor._mp_context.get_start_method(), 'spawn')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+ENTRY_LEDGER_PATH = PROJECT_ROOT / 'core' / 'entry_ledger.py'
+
+spec = importlib.util.spec_from_file_location('core.entry_ledger', ENTRY_LEDGER_PATH)
+entry_ledger = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(entry_ledger)
+EntryLedger = entry_ledger.EntryLedger
+
+
+class EntryLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = EntryLedger(str(Path(self.tmp.name) / 'ledger.db'))
+        self.agents = {
+            'summary': {'title': 'AI summary:', 'prompt': 'Summarize ${content}'},
+            'translate': {'title': 'AI translate:', 'prompt': 'Translate'},
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entry_is_handled_once_every_agent_is_recorded(self):
+        entry = {'id': 1, 'content': '<p>Hello</p>'}
+        self.ledger.record(entry, {'summary': (self.agents['summary'], 'done')})
+        self.assertEqual(self.ledger.unhandled([entry], self.agents), [entry])
+
+        self.ledger.record(entry, {'translate': (self.agents['translate'], 'skipped')})
+        self.assertEqual(self.ledger.unhandled([entry], self.agents), [])
+
+    def test_rewritten_content_is_not_reprocessed(self):
+        entry = {'id': 2, 'content': '<p>Hello</p>'}
+        self.ledger.record(entry, {name: (agent, 'done') for name, agent in self.agents.items()})
+        rewritten = {'id': 2, 'content': 'AI summary: ... <p>Hello</p>'}
+        self.assertEqual(self.ledger.unhandled([rewritten], self.agents), [])
+
+    def test_changed_prompt_reopens_entry(self):
+        entry = {'id': 3, 'content': '<p>Hello</p>'}
+        self.ledger.record(entry, {name: (agent, 'done') for name, agent in self.agents.items()})
+        edited = dict(self.agents, translate={'title': 'AI translate:', 'prompt': 'Translate to French'})
+        self.assertEqual(self.ledger.unhandled([entry], edited), [entry])
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(self.ledger.get_cursor('poll'), 0)
+        self.ledger.set_cursor('poll', 42)
+        self.assertEqual(self.ledger.get_cursor('poll'), 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import concurrent.futures
+import importlib.util
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load(name):
+    # entry_queue imports its policy modules by name, so they are registered before it loads
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, PROJECT_ROOT / Path(*name.split('.')).with_suffix('.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+_load('core.feed_quota')
+_load('core.priority')
+entry_queue = _load('core.entry_queue')
+EntryQueue = entry_queue.EntryQueue
+DEFERRED = entry_queue.DEFERRED
+FeedQuotas = sys.modules['core.feed_quota'].FeedQuotas
+
+
+class ShortQuota:
+    """Defers every entry once for ``wait`` seconds."""
+
+    def __init__(self, wait):
+        self.wait = wait
+        self.seen = set()
+
+    def delay(self, entry, now):
+        if entry['id'] in self.seen:
+            return 0.0
+        self.seen.add(entry['id'])
+        return self.wait
+
+    def acquire(self, entry, now):
+        pass
+
+    def release(self, entry):
+        pass
+
+
+class FlakyLeases:
+    """Grants every lease, optionally after ``claim_gate`` opens, and fails to release them."""
+
+    def __init__(self):
+        self.claim_gate = threading.Event()
+        self.claim_gate.set()
+
+    def claim(self, entry_ids, owner, ttl):
+        self.claim_gate.wait(5)
+        return set(entry_ids)
+
+    def renew(self, entry_ids, owner, ttl):
+        return set(entry_ids)
+
+    def release(self, entry_id, owner, done=False):
+        raise sqlite3.OperationalError('database is locked')
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached in time')
+        time.sleep(0.02)
+
+
+def _entry(entry_id, site_url='https://noisy.com/rss'):
+    return {'id': entry_id, 'content': f'entry {entry_id}', 'feed': {'site_url': site_url, 'category': {'title': 'News'}}}
+
+
+class EntryQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'queue.db')
+        self.handled = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _handler(self, entry):
+        self.release.wait(5)
+        self.handled.append(entry['id'])
+        return entry['id']
+
+    def _queue(self, **kwargs):
+        queue = EntryQueue(self.path, self._handler, workers=1, **kwargs)
+        queue.start()
+        return queue
+
+    def test_duplicate_submissions_share_one_work_item(self):
+        self.release.clear()
+        queue = self._queue()
+        first = queue.submit(_entry(1), 'poll')
+        second = queue.submit(_entry(1), 'webhook')
+        self.assertIs(first, second)
+        self.release.set()
+        self.assertEqual(first.result(timeout=5), 1)
+        self.assertEqual(self.handled, [1])
+
+    def test_quota_defers_without_keeping_submitters_waiting(self):
+        queue = self._queue(quotas=FeedQuotas(feeds={'https://noisy.com/*': {'max_per_hour': 1}}))
+        self.assertEqual(queue.submit(_entry(1), 'poll').result(timeout=5), 1)
+        self.assertIs(queue.submit(_entry(2), 'poll').result(timeout=5), DEFERRED)
+
+        # the next poll re-fetches the entry while it is still held back
+        resubmitted = queue.submit(_entry(2), 'poll')
+        self.assertTrue(resubmitted.done())
+        self.assertIs(resubmitted.result(), DEFERRED)
+        self.assertEqual(queue.stats()['deferred'], 1)
+        self.assertEqual(queue.wait_replayed(timeout=0), 0)
+        self.assertEqual(self.handled, [1])
+
+    def test_deferred_entry_is_admitted_again_once_its_quota_frees(self):
+        queue = self._queue(quotas=ShortQuota(wait=0.2))
+        self.assertIs(queue.submit(_entry(1), 'poll').result(timeout=5), DEFERRED)
+        self.assertEqual(queue.due_deferred(), [])
+        _wait_for(lambda: queue.due_deferred() == [1])
+        # the poller fetches it again and submits it
+        self.assertEqual(queue.submit(_entry(1), 'poll').result(timeout=5), 1)
+        self.assertEqual(queue.stats()['deferred'], 0)
+
+    def test_backlog_counts_deferred_entries_only_once_due(self):
+        self.release.clear()
+        quotas = ShortQuota(wait=60)
+        queue = self._queue(quotas=quotas)
+        self.assertIs(queue.submit(_entry(1), 'poll').result(timeout=5), DEFERRED)
+        self.assertEqual(queue.backlog(), 0)
+        self.assertEqual(queue.backlog(now=time.time() + 61), 1)
+
+        quotas.seen.update({2, 3})
+        queue.submit(_entry(2), 'poll')
+        queue.submit(_entry(3), 'poll')
+        _wait_for(lambda: queue.stats()['in_flight'])
+        # one entry in flight, one queued behind it
+        self.assertEqual(queue.backlog(), 1)
+        self.release.set()
+
+    def test_deferred_entries_are_not_kept_queued(self):
+        self.release.clear()
+        queue = self._queue(quotas=FeedQuotas(feeds={'https://noisy.com/*': {'max_per_hour': 2}}))
+        futures = [queue.submit(_entry(entry_id), 'poll') for entry_id in range(1, 51)]
+        self.release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(len([result for result in results if result is not DEFERRED]), 2)
+        stats = queue.stats()
+        self.assertEqual((stats['depth'], stats['deferred']), (0, 48))
+        # neither in memory nor in queue.db; a restart only remembers the ids
+        restarted = EntryQueue(self.path, self._handler, workers=1)
+        self.assertEqual(restarted.replayed, [])
+        self.assertIs(restarted.submit(_entry(3), 'poll').result(timeout=0), DEFERRED)
+
+    def test_deferred_entries_read_meanwhile_can_be_forgotten(self):
+        queue = self._queue(quotas=ShortQuota(wait=0.05))
+        self.assertIs(queue.submit(_entry(1), 'poll').result(timeout=5), DEFERRED)
+        _wait_for(lambda: queue.due_deferred() == [1])
+        queue.forget_deferred(1)
+        self.assertEqual(queue.due_deferred(), [])
+        self.assertEqual(queue.stats()['deferred'], 0)
+
+    def test_failed_lease_release_still_settles_the_entry(self):
+        queue = self._queue(leases=FlakyLeases(), owner='a')
+        self.assertEqual(queue.submit(_entry(1), 'poll').result(timeout=5), 1)
+        self.assertEqual(queue.stats()['processed'], 1)
+        self.assertEqual(queue.submit(_entry(2), 'poll').result(timeout=5), 2)
+
+    def test_slow_lease_claim_does_not_block_the_queue(self):
+        leases = FlakyLeases()
+        queue = self._queue(leases=leases, owner='a')
+        leases.claim_gate.clear()
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            claiming = executor.submit(queue.submit, _entry(1), 'poll')
+            _wait_for(lambda: claiming.running())
+            # the lock stays available to workers, stats and other submitters meanwhile
+            self.assertEqual(queue.stats()['depth'], 0)
+            leases.claim_gate.set()
+            self.assertEqual(claiming.result(timeout=5).result(timeout=5), 1)
+
+    def test_queued_entries_are_replayed_after_a_restart(self):
+        self.release.clear()
+        queue = self._queue()
+        queue.submit(_entry(1), 'poll')
+        queue.submit(_entry(2), 'poll')
+
+        # a second queue on the same file stands in for the restarted process
+        restarted = EntryQueue(self.path, self._handler, workers=1)
+        self.assertEqual(restarted.replayed, [1, 2])
+        restarted.start()
+        self.release.set()
+        self.assertEqual(restarted.wait_replayed(timeout=5), 2)
+        self.assertEqual(restarted.stats()['processed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FEED_QUOTA_PATH = PROJECT_ROOT / 'core' / 'feed_quota.py'
+
+spec = importlib.util.spec_from_file_location('core.feed_quota', FEED_QUOTA_PATH)
+feed_quota = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(feed_quota)
+FeedQuotas = feed_quota.FeedQuotas
+
+
+def _entry(site_url='https://noisy.com/rss', category='News'):
+    return {'feed': {'site_url': site_url, 'category': {'title': category}}}
+
+
+class FeedQuotasTest(unittest.TestCase):
+    def test_hourly_quota_defers_until_window_frees(self):
+        quotas = FeedQuotas(feeds={'https://noisy.com/*': {'max_per_hour': 2}})
+        for now in (0, 10):
+            self.assertEqual(quotas.delay(_entry(), now), 0)
+            quotas.acquire(_entry(), now)
+            quotas.release(_entry())
+
+        self.assertEqual(quotas.delay(_entry(), 20), 3580)
+        self.assertEqual(quotas.delay(_entry(site_url='https://quiet.com/rss'), 20), 0)
+        self.assertEqual(quotas.delay(_entry(), 3600), 0)
+
+    def test_feed_globs_apply_per_feed(self):
+        quotas = FeedQuotas(feeds={'https://*.noisy.com/*': {'max_per_hour': 1}})
+        quotas.acquire(_entry('https://a.noisy.com/rss'), 0)
+        self.assertGreater(quotas.delay(_entry('https://a.noisy.com/rss'), 1), 0)
+        self.assertEqual(quotas.delay(_entry('https://b.noisy.com/rss'), 1), 0)
+
+    def test_concurrency_limit_blocks_without_deferring(self):
+        quotas = FeedQuotas(categories={'News': {'max_concurrent': 1}})
+        quotas.acquire(_entry(), 0)
+        self.assertIsNone(quotas.delay(_entry('https://other.com/'), 1))
+        quotas.release(_entry())
+        self.assertEqual(quotas.delay(_entry('https://other.com/'), 1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import app_env  # noqa: F401  (loads the pipeline against a test config)
+from core import fetch_unread_entries, process_entries
+from core.entry_ledger import EntryLedger, agents_hash
+from core.entry_queue import CLAIMED_ELSEWHERE, DEFERRED
+
+config = process_entries.config
+
+
+def _entry(entry_id, status='unread'):
+    return {
+        'id': entry_id,
+        'status': status,
+        'title': f'Entry {entry_id}',
+        'content': f'<p>entry {entry_id}</p>',
+        'feed': {'title': 'Feed', 'site_url': 'https://example.com/', 'category': {'title': 'News'}},
+    }
+
+
+class FakeMiniflux:
+    """Serves unread entries like ``GET /v1/entries`` and records every page request."""
+
+    def __init__(self, entries):
+        self.entries = {entry['id']: entry for entry in entries}
+        self.requests = []
+
+    def get_entries(self, **params):
+        self.requests.append(params)
+        unread = [entry for entry_id, entry in sorted(self.entries.items())
+                  if entry['status'] == 'unread' and entry_id > params.get('after_entry_id', 0)]
+        return {'total': len(unread), 'entries': unread[:params['limit']]}
+
+    def get_entry(self, entry_id):
+        return self.entries[entry_id]
+
+
+class FakeQueue:
+    """Settles each submitted entry at once with the outcome configured for its id."""
+
+    leases = None
+
+    def __init__(self):
+        self.outcomes = {}
+        self.deferred = set()
+        self.due = []
+        self.submitted = []
+
+    def submit(self, entry, source):
+        self.submitted.append(entry['id'])
+        future = concurrent.futures.Future()
+        outcome = self.outcomes.get(entry['id'])
+        if isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            if outcome is DEFERRED:
+                self.deferred.add(entry['id'])
+            future.set_result(entry['id'] if outcome is None else outcome)
+        return future
+
+    def due_deferred(self):
+        return [entry_id for entry_id in self.due if entry_id in self.deferred]
+
+    def forget_deferred(self, entry_id):
+        self.deferred.discard(entry_id)
+
+
+class FetchUnreadEntriesTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.ledger = EntryLedger(os.path.join(tmp.name, 'ledger.db'))
+        self.queue = FakeQueue()
+        for target, value in (
+            ('ledger', self.ledger),
+            ('get_work_queue', lambda miniflux_client: self.queue),
+            ('similarity_index', mock.Mock()),
+        ):
+            mock.patch.object(fetch_unread_entries, target, value).start()
+        mock.patch.object(config, 'miniflux_page_size', 2).start()
+        mock.patch.object(config, 'miniflux_incremental_fetch', True).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _poll(self, client):
+        return fetch_unread_entries.fetch_unread_entries(config, client)
+
+    def _cursor(self):
+        return self.ledger.get_cursor(f'poll:{agents_hash(config.agents)}')
+
+    def test_pages_are_requested_after_the_last_id_until_a_short_page(self):
+        client = FakeMiniflux([_entry(entry_id) for entry_id in (3, 5, 8, 13, 21)])
+        self.assertEqual(self._poll(client)['processed'], 5)
+
+        self.assertEqual([request.get('after_entry_id') for request in client.requests], [None, 5, 13])
+        self.assertEqual(client.requests[0], {'status': ['unread'], 'limit': 2, 'order': 'id', 'direction': 'asc'})
+        self.assertEqual(self.queue.submitted, [3, 5, 8, 13, 21])
+
+    def test_a_full_last_page_ends_on_the_following_empty_page(self):
+        client = FakeMiniflux([_entry(entry_id) for entry_id in (1, 2, 3, 4)])
+        self._poll(client)
+        self.assertEqual([request.get('after_entry_id') for request in client.requests], [None, 2, 4])
+
+    def test_cursor_advances_so_the_next_poll_only_sees_new_entries(self):
+        client = FakeMiniflux([_entry(entry_id) for entry_id in (1, 2, 3)])
+        self._poll(client)
+        self.assertEqual(self._cursor(), 3)
+
+        client.entries[4] = _entry(4)
+        client.requests.clear()
+        self._poll(client)
+        self.assertEqual(client.requests[0]['after_entry_id'], 3)
+        self.assertEqual(self.queue.submitted, [1, 2, 3, 4])
+        self.assertEqual(self._cursor(), 4)
+
+        client.requests.clear()
+        self.assertEqual(self._poll(client), {'fetched': 0})
+        self.assertEqual(self._cursor(), 4)
+
+    def test_cursor_is_held_below_failed_and_remote_entries(self):
+        client = FakeMiniflux([_entry(entry_id) for entry_id in range(1, 7)])
+        self.queue.outcomes = {3: RuntimeError('LLM unavailable'), 5: CLAIMED_ELSEWHERE}
+        result = self._poll(client)
+
+        self.assertEqual((result['processed'], result['failed'], result['remote']), (4, 1, 1))
+        self.assertEqual(self._cursor(), 2)
+
+        # both are retried by the next poll; the cursor then catches up
+        self.queue.outcomes = {}
+        self._poll(client)
+        self.assertEqual(client.requests[-1]['after_entry_id'], 6)
+        self.assertEqual(self._cursor(), 6)
+
+    def test_deferred_entries_do_not_hold_the_cursor_and_are_fetched_once_due(self):
+        client = FakeMiniflux([_entry(entry_id) for entry_id in range(1, 5)])
+        self.queue.outcomes = {2: DEFERRED, 3: DEFERRED}
+        self.assertEqual(self._poll(client)['deferred'], 2)
+        self.assertEqual(self._cursor(), 4)
+
+        # the user read entry 3 meanwhile; only entry 2 is submitted again
+        client.entries[3]['status'] = 'read'
+        self.queue.outcomes = {}
+        self.queue.due = [2, 3]
+        self.queue.submitted.clear()
+        client.requests.clear()
+        result = self._poll(client)
+
+        self.assertEqual(self.queue.submitted, [2])
+        self.assertEqual(self.queue.deferred, {2})
+        self.assertEqual(client.requests[0]['after_entry_id'], 4)
+        self.assertEqual((result['fetched'], result['processed']), (1, 1))
+        self.assertEqual(self._cursor(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
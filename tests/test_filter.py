@@ -10,6 +10,7 @@ spec = importlib.util.spec_from_file_location('core.entry_filter', ENTRY_FILTER_
 entry_filter = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(entry_filter)
 filter_entry = entry_filter.filter_entry
+FilterPlan = entry_filter.FilterPlan
 
 
 class DummyConfig(SimpleNamespace):
@@ -148,5 +149,109 @@ class FilterEntryTest(unittest.TestCase):
         self.assertTrue(filter_entry(config, agent, entry))
 
 
+class FilterPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.agents = {
+            'summary': {
+                'title': 'AI summary:',
+                'style_block': True,
+                'deny_list': ['https://ai-news.miniflux*'],
+            },
+            'translate': {
+                'title': '🌐AI translate: ',
+                'style_block': False,
+                'auto_translate_non_chinese': True,
+                'allow_list': ['https://allowed.com/*', 'https://other.com/*'],
+            },
+        }
+        self.plan = FilterPlan(self.agents)
+
+    def test_classify_page_in_configured_order(self):
+        entries = [
+            {'id': 1, 'title': 'Hello', 'content': '<p>Hello</p>', 'feed': {'site_url': 'https://allowed.com/a'}},
+            {'id': 2, 'title': '新闻', 'content': '<p>测试</p>', 'feed': {'site_url': 'https://other.com/b'}},
+            {'id': 3, 'title': 'Digest', 'content': 'news', 'feed': {'site_url': 'https://ai-news.miniflux'}},
+            {'id': 4, 'title': 'Done', 'content': '<pre>old', 'feed': {'site_url': 'https://allowed.com/a'}},
+        ]
+
+        self.assertEqual(self.plan.classify(entries), {
+            1: ['summary', 'translate'],
+            2: ['summary'],
+            3: [],
+            4: [],
+        })
+
+    def test_empty_allow_list_matches_nothing(self):
+        plan = FilterPlan({'translate': {'title': 'T', 'allow_list': []}})
+        entry = {'id': 1, 'title': 'x', 'content': 'x', 'feed': {'site_url': 'https://allowed.com/a'}}
+        self.assertEqual(plan.agents_for(entry), [])
+
+    def test_whitelist_is_accepted_as_allow_list(self):
+        plan = FilterPlan({'translate': {'title': 'T', 'whitelist': ['https://allowed.com/*']}})
+        entry = {'id': 1, 'title': 'x', 'content': 'x', 'feed': {'site_url': 'https://blocked.com/a'}}
+        self.assertEqual(plan.agents_for(entry), [])
+
+    def test_worker_reuses_the_poller_selection(self):
+        entry = {'id': 1, 'title': 'Hello', 'content': '<p>Hello</p>', 'feed': {'site_url': 'https://allowed.com/a'}}
+        self.plan.classify([entry])
+        # the language verdict is not recomputed for the classified entry
+        entry['title'] = '新闻'
+        self.assertEqual(self.plan.selection(entry), ['summary', 'translate'])
+        self.assertEqual(self.plan.selection(entry), ['summary'])
+
+    def test_equal_configs_share_one_plan(self):
+        first = DummyConfig(agents=dict(self.agents))
+        second = DummyConfig(agents=dict(self.agents))
+        plan = entry_filter.get_filter_plan(first)
+        self.assertIs(entry_filter.get_filter_plan(second), plan)
+        self.assertIs(entry_filter.get_filter_plan(first), plan)
+
+        changed = DummyConfig(agents={'summary': self.agents['summary']})
+        self.assertIsNot(entry_filter.get_filter_plan(changed), plan)
+
+
+class LanguageDetectionTest(unittest.TestCase):
+    def setUp(self):
+        self.agents = {'translate': {'title': 'T', 'auto_translate_non_chinese': True}}
+        entry_filter._learned_languages.clear()
+
+    def test_detection_is_bounded_to_the_sample(self):
+        plan = FilterPlan(self.agents, sample_chars=100)
+        entry = {'id': 1, 'title': 'Hello', 'content': '<p>' + 'a' * 500 + '</p><p>中文</p>',
+                 'feed': {'site_url': 'https://a.com'}}
+        self.assertFalse(plan.has_cjk(entry))
+
+    def test_markup_and_scripts_are_not_counted(self):
+        plan = FilterPlan(self.agents, sample_chars=20)
+        entry = {'id': 1, 'title': 'Hello',
+                 'content': '<img src="data:image/png;base64,' + 'A' * 500 + '"><script>var x = 1;</script><p>中文</p>',
+                 'feed': {'site_url': 'https://a.com'}}
+        self.assertTrue(plan.has_cjk(entry))
+
+    def test_configured_feed_language_skips_detection(self):
+        plan = FilterPlan(self.agents, feed_languages={'https://cn.example.com/*': 'chinese'})
+        entry = {'id': 1, 'title': 'English title', 'content': 'English body',
+                 'feed': {'site_url': 'https://cn.example.com/rss'}}
+        self.assertEqual(plan.agents_for(entry), [])
+
+    def test_feed_language_is_learned_after_consistent_verdicts(self):
+        plan = FilterPlan(self.agents, learn_after=2)
+        feed = {'site_url': 'https://cn.example.com/rss'}
+        for entry_id in (1, 2):
+            plan.has_cjk({'id': entry_id, 'title': '新闻', 'content': '', 'feed': feed})
+        self.assertTrue(plan.has_cjk({'id': 3, 'title': 'English', 'content': 'English', 'feed': feed}))
+
+    def test_learned_feed_languages_survive_a_plan_rebuild(self):
+        feed = {'site_url': 'https://cn.example.com/rss'}
+        config = DummyConfig(agents=self.agents, filter_learn_after=2)
+        for entry_id in (1, 2):
+            entry_filter.get_filter_plan(config).has_cjk({'id': entry_id, 'title': '新闻', 'content': '', 'feed': feed})
+
+        # editing an agent compiles a new plan
+        changed = DummyConfig(agents={'translate': dict(self.agents['translate'], title='U')}, filter_learn_after=2)
+        rebuilt = entry_filter.get_filter_plan(changed)
+        self.assertTrue(rebuilt.has_cjk({'id': 3, 'title': 'English', 'content': 'English', 'feed': feed}))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,119 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import app_env  # noqa: F401  (loads the pipeline against a test config)
+from core import generate_daily_news
+from core.ai_news_feed import AINewsFeed
+from core.summary_store import SummaryStore
+
+
+class FakeLLM:
+    """Answers every digest prompt with a tag listing the summaries it was given."""
+
+    def __init__(self):
+        self.requests = []
+        self.fail_on = None
+
+    def submit(self, prompt, request):
+        future = concurrent.futures.Future()
+        self.requests.append(request)
+        if self.fail_on and self.fail_on in request:
+            future.set_exception(RuntimeError('LLM unavailable'))
+        else:
+            future.set_result('digest of ' + ' + '.join(sorted(word for word in request.split() if word.startswith('S'))))
+        return future
+
+    def get(self, prompt, request):
+        return self.submit(prompt, request).result()
+
+
+class IncrementalDigestTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = SummaryStore(os.path.join(tmp.name, 'entries.jsonl'))
+        self.state_path = os.path.join(tmp.name, 'digest_state.json')
+        self.feed = AINewsFeed(os.path.join(tmp.name, 'ai_news.json'), keep=3)
+        self.llm = FakeLLM()
+        for target, value in (
+            ('summary_store', self.store),
+            ('digest_state_path', self.state_path),
+            ('ai_news_feed', self.feed),
+            ('submit_ai_result', self.llm.submit),
+            ('get_ai_result', self.llm.get),
+        ):
+            mock.patch.object(generate_daily_news, target, value).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _add(self, *summaries, category='Tech'):
+        for summary in summaries:
+            self.store.append({'category': category, 'title': summary, 'content': summary})
+
+    def _batches(self):
+        return [name for name in os.listdir(os.path.dirname(self.state_path)) if name.startswith('entries.jsonl.')]
+
+    def test_crash_between_saving_state_and_discarding_batches(self):
+        self._add('S1', 'S2')
+        with mock.patch.object(self.store, 'discard', side_effect=OSError('killed')):
+            with self.assertRaises(OSError):
+                generate_daily_news._fold_daily_news()
+        self.assertEqual(len(self._batches()), 1)
+
+        self._add('S3')
+        self.llm.requests.clear()
+        state = generate_daily_news._fold_daily_news()
+
+        # the batch folded before the crash is dropped, not folded a second time
+        self.assertEqual(state['items'], 3)
+        self.assertEqual(len(self.llm.requests), 1)
+        self.assertNotIn('S1', self.llm.requests[0].replace('digest of S1 + S2', ''))
+        self.assertEqual(state['categories']['Tech'], 'digest of S1 + S2 + S3')
+        self.assertEqual(self._batches(), [])
+
+    def test_failure_partway_through_a_category_keeps_the_batch(self):
+        self._add('S1')
+        generate_daily_news._fold_daily_news()
+        self._add('S2', category='World')
+        self._add('S3', 'S4')
+        self.llm.fail_on = 'S4'
+        with self.assertRaises(RuntimeError):
+            generate_daily_news._fold_daily_news()
+
+        # nothing of the failed fold is kept; its batch is folded again in full
+        self.assertEqual(generate_daily_news._load_digest_state()['items'], 1)
+        self.assertEqual(len(self._batches()), 1)
+        self.llm.fail_on = None
+        state = generate_daily_news._fold_daily_news()
+        self.assertEqual(state['items'], 4)
+        self.assertEqual(state['categories'], {'Tech': 'digest of S1 + S3 + S4', 'World': 'digest of S2'})
+        self.assertEqual(self._batches(), [])
+
+    def test_known_stories_are_skipped_across_folds_until_published(self):
+        mock.patch.object(generate_daily_news.config, 'dedup_enabled', True).start()
+        self.store.append({'category': 'Tech', 'content': 'S1', 'simhash': 'ff00ff00ff00ff00'})
+        generate_daily_news._fold_daily_news()
+        # the same story from another feed, folded later in the day
+        self.store.append({'category': 'Tech', 'content': 'S2', 'simhash': 'ff00ff00ff00ff01'})
+        self.assertEqual(generate_daily_news._fold_daily_news()['items'], 1)
+
+        miniflux_client = mock.Mock()
+        miniflux_client.get_feeds.return_value = []
+        generate_daily_news._publish_incremental_news(miniflux_client)
+        self.assertIn('digest of S1', self.feed.document()[0].decode())
+
+        state = generate_daily_news._load_digest_state()
+        self.assertEqual((state['categories'], state['items'], state['fingerprints']), ({}, 0, []))
+        # after publishing, the story may appear in the next digest again
+        self.store.append({'category': 'Tech', 'content': 'S3', 'simhash': 'ff00ff00ff00ff00'})
+        self.assertEqual(generate_daily_news._fold_daily_news()['items'], 1)
+
+    def test_nothing_is_published_without_new_summaries(self):
+        self.assertEqual(generate_daily_news._publish_incremental_news(mock.Mock()), [])
+        self.assertEqual(self.llm.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
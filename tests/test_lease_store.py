@@ -0,0 +1,64 @@
+import importlib.util
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LEASE_STORE_PATH = PROJECT_ROOT / 'core' / 'lease_store.py'
+
+spec = importlib.util.spec_from_file_location('core.lease_store', LEASE_STORE_PATH)
+lease_store = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(lease_store)
+LeaseStore = lease_store.LeaseStore
+SQLiteLeaseStore = lease_store.SQLiteLeaseStore
+
+
+class SQLiteLeaseStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = str(Path(self.tmp.name) / 'leases.db')
+        # two connections stand in for two replicas sharing the volume
+        self.first = SQLiteLeaseStore(path)
+        self.second = SQLiteLeaseStore(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_are_partitioned_between_replicas(self):
+        self.assertEqual(self.first.claim([1, 2], 'a', ttl=60), {1, 2})
+        self.assertEqual(self.second.claim([1, 2, 3], 'b', ttl=60), {3})
+        # claiming again is idempotent for the holder
+        self.assertEqual(self.first.claim([1], 'a', ttl=60), {1})
+
+    def test_expired_leases_are_reclaimed(self):
+        self.first.claim([1], 'a', ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(self.second.claim([1], 'b', ttl=60), {1})
+        self.assertEqual(self.first.renew([1], 'a', ttl=60), set())
+
+    def test_released_entries_are_free_and_done_entries_are_not(self):
+        self.first.claim([1, 2], 'a', ttl=60)
+        self.first.release(1, 'a')
+        self.first.release(2, 'a', done=True)
+        self.assertEqual(self.second.claim([1, 2], 'b', ttl=60), {1})
+        self.assertEqual(self.second.finished([1, 2]), {2})
+
+    def test_renew_extends_held_leases(self):
+        self.first.claim([1], 'a', ttl=0.05)
+        self.assertEqual(self.first.renew([1], 'a', ttl=60), {1})
+        time.sleep(0.06)
+        self.assertEqual(self.second.claim([1], 'b', ttl=60), set())
+
+
+class LeaseStoreTest(unittest.TestCase):
+    def test_backends_must_implement_the_whole_interface(self):
+        class WithoutPrune(LeaseStore):
+            claim = renew = release = finished = lambda self, *args, **kwargs: set()
+
+        with self.assertRaises(TypeError):
+            WithoutPrune()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import app_env  # noqa: F401  (loads the pipeline against a test config)
+from core import llm
+from core.llm_cache import LLMCache
+from core.llm_router import Backend, LLMRouter
+
+
+class FakeDispatcher:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def submit(self, model, messages, **budgets):
+        self.calls += 1
+        future = concurrent.futures.Future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            future.set_result(f'{model} answer')
+        return future
+
+
+class CheckBackendsTest(unittest.TestCase):
+    def test_valid_backends_and_pins_pass(self):
+        llm._check_backends([{'name': 'primary'}, {'name': 'fallback'}], {'summary': {'backend': 'fallback'}, 'x': {}})
+
+    def test_backend_without_name_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'needs a name'):
+            llm._check_backends([{'name': 'primary'}, {'base_url': 'http://fallback'}], {})
+
+    def test_duplicate_backend_names_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Duplicate LLM backend names: primary'):
+            llm._check_backends([{'name': 'primary'}, {'name': 'primary'}], {})
+
+    def test_pin_to_unknown_backend_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Agent summary is pinned to unknown LLM backend local'):
+            llm._check_backends([{'name': 'primary'}], {'summary': {'backend': 'local'}})
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = LLMCache(os.path.join(tmp.name, 'llm_cache.db'), ttl=3600, max_entries=100)
+        self.primary = Backend('primary', 'primary-model', FakeDispatcher(RuntimeError('down')))
+        self.backup = Backend('backup', 'backup-model', FakeDispatcher())
+        writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(writer.shutdown)
+        for target, value in (
+            ('cache', self.cache),
+            ('_cache_writer', writer),
+            ('router', LLMRouter([self.primary, self.backup])),
+        ):
+            mock.patch.object(llm, target, value).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_failover_answers_are_cached_under_the_model_that_gave_them(self):
+        messages = [{'role': 'user', 'content': 'Hello'}]
+        self.assertEqual(llm.submit_chat_completion(messages).result(timeout=1), 'backup-model answer')
+        llm._cache_writer.submit(lambda: None).result(timeout=1)
+        self.assertIsNone(self.cache.get('primary-model', messages))
+        self.assertEqual(self.cache.get('backup-model', messages), 'backup-model answer')
+
+        # unpinned requests take it; requests pinned to the primary do not
+        self.assertEqual(llm.submit_chat_completion(messages).result(timeout=1), 'backup-model answer')
+        self.assertEqual(self.backup.dispatcher.calls, 1)
+        with self.assertRaises(RuntimeError):
+            llm.submit_chat_completion(messages, backend='primary').result(timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import importlib.util
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LLM_CACHE_PATH = PROJECT_ROOT / 'core' / 'llm_cache.py'
+
+spec = importlib.util.spec_from_file_location('core.llm_cache', LLM_CACHE_PATH)
+llm_cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(llm_cache)
+LLMCache = llm_cache.LLMCache
+
+
+def _messages(text):
+    return [{'role': 'system', 'content': 'You are a helpful assistant.'}, {'role': 'user', 'content': text}]
+
+
+class LLMCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'cache.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_ignores_whitespace_differences(self):
+        cache = LLMCache(self.path, ttl=60, max_entries=10)
+        cache.put('model', _messages('Hello   world\n'), 'summary')
+        self.assertEqual(cache.get('model', _messages('Hello world')), 'summary')
+        self.assertIsNone(cache.get('other-model', _messages('Hello world')))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LLMCache(self.path, ttl=60, max_entries=2)
+        cache.put('model', _messages('a'), 'A')
+        time.sleep(0.01)
+        cache.put('model', _messages('b'), 'B')
+        time.sleep(0.01)
+        cache.get('model', _messages('a'))
+        cache.put('model', _messages('c'), 'C')
+
+        self.assertEqual(cache.get('model', _messages('a')), 'A')
+        self.assertIsNone(cache.get('model', _messages('b')))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_expired_entry_is_a_miss(self):
+        cache = LLMCache(self.path, ttl=0.01, max_entries=10)
+        cache.put('model', _messages('a'), 'A')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('model', _messages('a')))
+
+    def test_entries_survive_restart(self):
+        LLMCache(self.path, ttl=60, max_entries=10).put('model', _messages('a'), 'A')
+        self.assertEqual(LLMCache(self.path, ttl=60, max_entries=10).get('model', _messages('a')), 'A')
+
+
+if __name__ == '__main__':
+    unittest.main()
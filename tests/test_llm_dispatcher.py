@@ -0,0 +1,129 @@
+import asyncio
+import importlib.util
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LLM_DISPATCHER_PATH = PROJECT_ROOT / 'core' / 'llm_dispatcher.py'
+
+spec = importlib.util.spec_from_file_location('core.llm_dispatcher', LLM_DISPATCHER_PATH)
+llm_dispatcher = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(llm_dispatcher)
+LLMDispatcher = llm_dispatcher.LLMDispatcher
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def create(self, model, messages, timeout):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        message = SimpleNamespace(content=f'{model}:{messages[-1]["content"]}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class FakeStream:
+    def __init__(self, words, delay):
+        self.words = list(words)
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.words:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        delta = SimpleNamespace(content=self.words.pop(0) + ' ')
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStreamingCompletions:
+    def __init__(self, words=20, delay=0.01):
+        self.words = [f'word{i}' for i in range(words)]
+        self.delay = delay
+        self.streams = []
+
+    async def create(self, model, messages, timeout, stream):
+        self.streams.append(FakeStream(self.words, self.delay))
+        return self.streams[-1]
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class LLMDispatcherTest(unittest.TestCase):
+    def test_returns_response_text(self):
+        dispatcher = LLMDispatcher(_client(FakeCompletions(delay=0)), max_in_flight=2)
+        future = dispatcher.submit('model', [{'role': 'user', 'content': 'hi'}])
+        self.assertEqual(future.result(timeout=5), 'model:hi')
+
+    def test_max_in_flight_is_global(self):
+        completions = FakeCompletions()
+        dispatcher = LLMDispatcher(_client(completions), max_in_flight=2)
+        futures = [dispatcher.submit('model', [{'role': 'user', 'content': str(i)}]) for i in range(6)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(completions.calls, 6)
+        self.assertEqual(completions.peak, 2)
+
+    def test_requests_per_minute_budget_delays_excess_requests(self):
+        dispatcher = LLMDispatcher(_client(FakeCompletions(delay=0)), max_in_flight=10, rpm=120)
+        bucket = dispatcher._rpm
+        bucket.tokens = 1.0
+        started = time.monotonic()
+        futures = [dispatcher.submit('model', [{'role': 'user', 'content': str(i)}]) for i in range(2)]
+        for future in futures:
+            future.result(timeout=5)
+        # 120 RPM refills one request every 0.5s once the burst is spent.
+        self.assertGreaterEqual(time.monotonic() - started, 0.4)
+
+
+    def test_stream_returns_complete_text(self):
+        dispatcher = LLMDispatcher(_client(FakeStreamingCompletions(words=3, delay=0)), max_in_flight=1)
+        result = dispatcher.submit('model', [{'role': 'user', 'content': 'hi'}], stream=True).result(timeout=5)
+        self.assertEqual(result, 'word0 word1 word2 ')
+        self.assertNotIsInstance(result, llm_dispatcher.PartialResponse)
+
+    def test_stream_keeps_partial_text_when_time_budget_runs_out(self):
+        completions = FakeStreamingCompletions(words=100, delay=0.02)
+        dispatcher = LLMDispatcher(_client(completions), max_in_flight=1)
+        result = dispatcher.submit(
+            'model', [{'role': 'user', 'content': 'hi'}], stream=True, max_seconds=0.2
+        ).result(timeout=5)
+        self.assertIsInstance(result, llm_dispatcher.PartialResponse)
+        self.assertEqual(result.reason, 'time')
+        self.assertTrue(result.startswith('word0 '))
+        self.assertTrue(completions.streams[0].closed)
+
+    def test_stream_stops_at_output_token_budget(self):
+        dispatcher = LLMDispatcher(_client(FakeStreamingCompletions(words=100, delay=0)), max_in_flight=1)
+        result = dispatcher.submit(
+            'model', [{'role': 'user', 'content': 'hi'}], stream=True, max_output_tokens=10
+        ).result(timeout=5)
+        self.assertEqual(result.reason, 'tokens')
+        self.assertLess(len(result.split()), 100)
+
+    def test_stream_without_any_token_raises(self):
+        dispatcher = LLMDispatcher(_client(FakeStreamingCompletions(words=5, delay=0.5)), max_in_flight=1)
+        future = dispatcher.submit('model', [{'role': 'user', 'content': 'hi'}], stream=True, max_seconds=0.1)
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import concurrent.futures
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LLM_ROUTER_PATH = PROJECT_ROOT / 'core' / 'llm_router.py'
+
+spec = importlib.util.spec_from_file_location('core.llm_router', LLM_ROUTER_PATH)
+llm_router = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(llm_router)
+Backend = llm_router.Backend
+LLMRouter = llm_router.LLMRouter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeDispatcher:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def submit(self, model, messages, **budgets):
+        self.calls.append(model)
+        future = concurrent.futures.Future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            future.set_result(f'{model} answer')
+        return future
+
+
+def _backend(name, error=None, latency=None):
+    backend = Backend(name, f'{name}-model', FakeDispatcher(error), max_in_flight=2)
+    backend.latency = latency
+    return backend
+
+
+class LLMRouterTest(unittest.TestCase):
+    def test_prefers_lowest_latency_backend(self):
+        slow, fast = _backend('slow', latency=2.0), _backend('fast', latency=0.5)
+        router = LLMRouter([slow, fast])
+        self.assertEqual(router.submit([]).result(timeout=1), 'fast-model answer')
+        self.assertEqual(slow.dispatcher.calls, [])
+
+    def test_fails_over_and_cools_down_rate_limited_backend(self):
+        limited, backup = _backend('limited', RateLimited('slow down'), latency=0.1), _backend('backup', latency=1.0)
+        router = LLMRouter([limited, backup], cooldown=60)
+        self.assertEqual(router.submit([]).result(timeout=1), 'backup-model answer')
+        self.assertFalse(router.stats()['limited']['available'])
+
+        router.submit([]).result(timeout=1)
+        self.assertEqual(len(limited.dispatcher.calls), 1)
+
+    def test_reports_the_model_that_answered_after_failover(self):
+        primary, backup = _backend('primary', RuntimeError('down')), _backend('backup')
+        router = LLMRouter([primary, backup])
+        answers = []
+        router.submit([], on_answer=lambda model, text: answers.append((model, text))).result(timeout=1)
+        self.assertEqual(answers, [('backup-model', 'backup-model answer')])
+        self.assertEqual(router.models(), ['primary-model', 'backup-model'])
+        self.assertEqual(router.models('backup'), ['backup-model'])
+
+    def test_failures_cool_down_after_threshold(self):
+        broken, backup = _backend('broken', RuntimeError('down'), latency=0.1), _backend('backup', latency=1.0)
+        router = LLMRouter([broken, backup], failure_threshold=2)
+        router.submit([]).result(timeout=1)
+        self.assertTrue(router.stats()['broken']['available'])
+        router.submit([]).result(timeout=1)
+        self.assertFalse(router.stats()['broken']['available'])
+
+    def test_pinned_backend_does_not_fail_over(self):
+        broken, backup = _backend('broken', RuntimeError('down')), _backend('backup')
+        router = LLMRouter([backup, broken])
+        with self.assertRaises(RuntimeError):
+            router.submit([], backend='broken').result(timeout=1)
+        self.assertEqual(backup.dispatcher.calls, [])
+        with self.assertRaises(ValueError):
+            router.submit([], backend='missing')
+
+    def test_latency_is_smoothed(self):
+        backend = _backend('only')
+        router = LLMRouter([backend], smoothing=0.5)
+        router._record_success(backend, 1.0)
+        router._record_success(backend, 3.0)
+        self.assertAlmostEqual(backend.latency, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+METRICS_PATH = PROJECT_ROOT / 'common' / 'metrics.py'
+
+spec = importlib.util.spec_from_file_location('common.metrics', METRICS_PATH)
+metrics = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(metrics)
+
+
+class MetricsTest(unittest.TestCase):
+    def test_counter_and_gauge_exposition(self):
+        counter = metrics.Counter('test_entries_total', 'Entries.', ['feed'])
+        counter.inc(feed='a "quoted" feed')
+        counter.inc(2, feed='a "quoted" feed')
+        gauge = metrics.Gauge('test_queue_depth', 'Depth.')
+        gauge.set_function(lambda: 3)
+
+        output = metrics.render_metrics()
+        self.assertIn('# TYPE test_entries_total counter', output)
+        self.assertIn('test_entries_total{feed="a \\"quoted\\" feed"} 3', output)
+        self.assertIn('test_queue_depth 3', output)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_latency_seconds', 'Latency.', ['agent'], buckets=(1, 5))
+        for value in (0.5, 2, 10):
+            histogram.observe(value, agent='summary')
+
+        output = metrics.render_metrics()
+        self.assertIn('test_latency_seconds_bucket{agent="summary",le="1.0"} 1', output)
+        self.assertIn('test_latency_seconds_bucket{agent="summary",le="5.0"} 2', output)
+        self.assertIn('test_latency_seconds_bucket{agent="summary",le="+Inf"} 3', output)
+        self.assertIn('test_latency_seconds_count{agent="summary"} 3', output)
+        self.assertIn('test_latency_seconds_sum{agent="summary"} 12.5', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
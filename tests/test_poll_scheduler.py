@@ -0,0 +1,85 @@
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+POLL_SCHEDULER_PATH = PROJECT_ROOT / 'core' / 'poll_scheduler.py'
+
+spec = importlib.util.spec_from_file_location('core.poll_scheduler', POLL_SCHEDULER_PATH)
+poll_scheduler = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(poll_scheduler)
+PollScheduler = poll_scheduler.PollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.results = []
+        self.signature = ('counters', 1)
+        self.depth = 0
+        self.scheduler = PollScheduler(
+            lambda: self.results.pop(0),
+            signature=lambda: self.signature,
+            backlog=lambda: self.depth,
+            interval=60,
+            min_interval=30,
+            max_interval=240,
+            force_after=600,
+            clock=self.clock,
+        )
+
+    def test_skips_poll_while_counters_are_unchanged(self):
+        self.results = [{'fetched': 5}]
+        self.assertEqual(self.scheduler.cycle(), 'polled')
+        self.assertEqual(self.scheduler.cycle(), 'skipped')
+
+        self.signature = ('counters', 2)
+        self.results = [{'fetched': 1}]
+        self.assertEqual(self.scheduler.cycle(), 'polled')
+
+    def test_forces_poll_after_limit_and_retries_unsettled_cycles(self):
+        self.results = [{'fetched': 5, 'failed': 1}, {'fetched': 1}, {'fetched': 0}]
+        self.scheduler.cycle()
+        # the failed entry must be retried even though Miniflux did not change
+        self.assertEqual(self.scheduler.cycle(), 'polled')
+        self.clock.now = 601
+        self.assertEqual(self.scheduler.cycle(), 'polled')
+
+    def test_deferred_entries_only_trigger_a_poll_once_due(self):
+        self.results = [{'fetched': 5, 'deferred': 3}, {'fetched': 3}]
+        self.scheduler.cycle()
+        # held back by their quota: nothing to do until it frees up
+        self.assertEqual(self.scheduler.cycle(), 'skipped')
+        self.depth = 3
+        self.assertEqual(self.scheduler.cycle(), 'polled')
+
+    def test_interval_adapts_to_backlog_and_idleness(self):
+        self.results = [{'fetched': 10}]
+        self.depth = 10
+        self.scheduler.cycle()
+        self.assertEqual(self.scheduler.interval, 30)
+
+        self.depth = 0
+        for _ in range(6):
+            self.signature = object()
+            self.results.append({'fetched': 0})
+            self.scheduler.cycle()
+        self.assertEqual(self.scheduler.interval, 240)
+
+    def test_failed_poll_is_not_fatal(self):
+        def fail():
+            raise RuntimeError('miniflux down')
+        self.scheduler.poll = fail
+        self.assertEqual(self.scheduler.cycle(), 'failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
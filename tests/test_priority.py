@@ -0,0 +1,49 @@
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PRIORITY_PATH = PROJECT_ROOT / 'core' / 'priority.py'
+
+spec = importlib.util.spec_from_file_location('core.priority', PRIORITY_PATH)
+priority = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(priority)
+PriorityPolicy = priority.PriorityPolicy
+
+NOW = 1_700_000_000.0
+
+
+def _entry(published_at=None, site_url='https://a.com/', category='News'):
+    return {'id': 1, 'published_at': published_at,
+            'feed': {'site_url': site_url, 'category': {'title': category}}}
+
+
+class PriorityPolicyTest(unittest.TestCase):
+    def test_webhook_entries_jump_ahead_of_backlog(self):
+        policy = PriorityPolicy(poll_delay=600)
+        backlog = policy.key(_entry(), 'poll', NOW)
+        webhook = policy.key(_entry(), 'webhook', NOW + 60)
+        self.assertLess(webhook, backlog)
+
+    def test_fresh_articles_rank_before_stale_ones(self):
+        policy = PriorityPolicy(recency_weight=0.01)
+        fresh = policy.key(_entry('2023-11-14T22:00:00Z'), 'poll', NOW)
+        stale = policy.key(_entry('2023-11-10T22:00:00Z'), 'poll', NOW)
+        self.assertLess(fresh, stale)
+
+    def test_feed_and_category_weights(self):
+        policy = PriorityPolicy(feeds={'https://vip.com/*': 4}, categories={'Sports': 0.5})
+        normal = policy.key(_entry(), 'poll', NOW)
+        self.assertLess(policy.key(_entry(site_url='https://vip.com/rss'), 'poll', NOW), normal)
+        self.assertGreater(policy.key(_entry(category='Sports'), 'poll', NOW), normal)
+
+    def test_delay_is_capped_to_prevent_starvation(self):
+        policy = PriorityPolicy(poll_delay=600, max_delay=900, categories={'Slow': 0.01})
+        backlog = policy.key(_entry(category='Slow'), 'poll', NOW)
+        self.assertEqual(backlog, NOW + 900)
+        # anything enqueued after the cap has elapsed is served later
+        self.assertGreater(policy.key(_entry(), 'webhook', NOW + 901), backlog)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import concurrent.futures
+import itertools
+import threading
+import unittest
+from unittest import mock
+
+import app_env  # noqa: F401  (loads the pipeline against a test config)
+from core import process_entries
+
+_ids = itertools.count(1000)
+
+
+def _entry():
+    return {
+        'id': next(_ids),
+        'title': 'Title',
+        'content': '<p>Hello world</p>',
+        'feed': {'title': 'Feed', 'site_url': 'https://example.com/', 'category': {'title': 'News'}},
+    }
+
+
+class FakeLLM:
+    """Answers each agent after its own delay and records how many calls overlap."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages, **kwargs):
+        agent = messages[0]['content'].split()[-1].rstrip('.')
+        future = concurrent.futures.Future()
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+        def answer():
+            with self._lock:
+                self.running -= 1
+            future.set_result(f'answer of {agent}')
+
+        threading.Timer(self.delays[agent], answer).start()
+        return future
+
+
+class ProcessEntryTest(unittest.TestCase):
+    def setUp(self):
+        self.write_back = mock.patch.object(process_entries, 'write_back').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _written(self):
+        (_, content), _ = self.write_back.submit.call_args
+        return content
+
+    def test_agents_run_in_parallel_up_to_the_limit_and_render_in_config_order(self):
+        # later agents answer first
+        llm = FakeLLM({'first': 0.2, 'second': 0.05, 'third': 0.1, 'fourth': 0.01})
+        mock.patch.object(process_entries, 'submit_chat_completion', llm).start()
+        wait = mock.patch('concurrent.futures.wait', wraps=concurrent.futures.wait).start()
+
+        process_entries.process_entry(None, _entry())
+
+        self.assertEqual(llm.calls, 4)
+        self.assertEqual(llm.peak, 2)
+        content = self._written()
+        positions = [content.index(f'answer of {name}') for name in ('first', 'second', 'third', 'fourth')]
+        self.assertEqual(positions, sorted(positions))
+        self.assertTrue(content.endswith('<p>Hello world</p>'))
+        # one wait per slot that had to free up, not a busy loop
+        self.assertLessEqual(wait.call_count, 2)
+
+    def test_finished_agents_do_not_hold_parallelism_slots(self):
+        entry = _entry()
+        source_hash = process_entries.content_hash(entry['content'])
+        for name in ('first', 'second'):
+            agent_hash = process_entries.agent_hash(process_entries.config.agents[name])
+            process_entries.checkpoint_store.save(entry['id'], source_hash, name, agent_hash, f'saved {name}')
+        llm = FakeLLM({'third': 0.05, 'fourth': 0.05})
+        mock.patch.object(process_entries, 'submit_chat_completion', llm).start()
+        wait = mock.patch('concurrent.futures.wait', wraps=concurrent.futures.wait).start()
+
+        process_entries.process_entry(None, entry)
+
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(llm.peak, 2)
+        self.assertEqual(wait.call_count, 0)
+        content = self._written()
+        self.assertLess(content.index('saved second'), content.index('answer of third'))
+        # every answer is checkpointed before the entry's checkpoints are cleared
+        self.assertEqual(process_entries.checkpoint_store.load(entry['id'], source_hash), {})
+
+    def test_resumed_partial_answers_are_not_offered_to_near_duplicates(self):
+        entry = _entry()
+        source_hash = process_entries.content_hash(entry['content'])
+        for name in ('first', 'second', 'third', 'fourth'):
+            agent_hash = process_entries.agent_hash(process_entries.config.agents[name])
+            partial = 'tokens' if name == 'second' else None
+            process_entries.checkpoint_store.save(entry['id'], source_hash, name, agent_hash, f'saved {name}', partial)
+        mock.patch.object(process_entries, 'submit_chat_completion', FakeLLM({})).start()
+        mock.patch.object(process_entries, 'prepare_entry', return_value=('Hello world', 42)).start()
+        index = mock.patch.object(process_entries, 'similarity_index').start()
+        index.find.return_value = None
+
+        process_entries.process_entry(None, entry)
+
+        (_, fingerprint, outputs), _ = index.add.call_args
+        self.assertEqual(fingerprint, 42)
+        self.assertEqual(sorted(outputs), ['first', 'fourth', 'third'])
+        self.assertIn('saved second', self._written())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SIMILARITY_PATH = PROJECT_ROOT / 'core' / 'similarity.py'
+
+spec = importlib.util.spec_from_file_location('core.similarity', SIMILARITY_PATH)
+similarity = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(similarity)
+
+STORY = (
+    'The central bank kept interest rates unchanged on Wednesday, citing persistent inflation in services '
+    'and a labour market that remains tight despite slowing growth. Officials signalled that cuts could come '
+    'later this year if price pressures continue to ease, while warning that geopolitical risks and energy '
+    'prices could still push inflation higher. Markets had largely expected the decision.'
+)
+OTHER = (
+    'A new species of deep sea octopus was described by marine biologists after an expedition off the coast '
+    'of Costa Rica found a nursery of brooding females near hydrothermal springs. The researchers say warm '
+    'water speeds up embryo development and may explain why the animals gather there in such large numbers.'
+)
+
+
+class SimilarityTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = similarity.SimilarityIndex(str(Path(self.tmp.name) / 'similarity.db'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_near_duplicates_are_close(self):
+        wrapped = 'Reuters - ' + STORY + ' Reporting by staff.'
+        self.assertLessEqual(similarity.hamming(similarity.simhash(STORY), similarity.simhash(wrapped)), 8)
+        self.assertGreater(similarity.hamming(similarity.simhash(STORY), similarity.simhash(OTHER)), 10)
+
+    def test_short_text_has_no_fingerprint(self):
+        self.assertIsNone(similarity.simhash('Breaking news'))
+
+    def test_index_returns_outputs_of_near_duplicate(self):
+        fingerprint = similarity.simhash(STORY)
+        self.index.add(1, fingerprint, {'summary': ('hash', 'Rates unchanged.')})
+
+        match = self.index.find(fingerprint ^ 0b101, exclude=2)
+        self.assertEqual(match, 1)
+        self.assertEqual(self.index.output(match, 'summary', 'hash'), 'Rates unchanged.')
+        self.assertIsNone(self.index.output(match, 'summary', 'other-prompt'))
+        self.assertIsNone(self.index.find(similarity.simhash(OTHER)))
+        self.assertIsNone(self.index.find(fingerprint, exclude=1))
+
+    def test_high_bit_fingerprints_round_trip(self):
+        fingerprint = (1 << 63) | 12345
+        self.index.add(3, fingerprint, {})
+        self.assertEqual(self.index.find(fingerprint), 3)
+
+    def test_collapse_duplicates_keeps_first(self):
+        fingerprint = similarity.simhash(STORY)
+        records = [
+            {'content': 'a', 'simhash': format(fingerprint, 'x')},
+            {'content': 'b', 'simhash': format(fingerprint ^ 1, 'x')},
+            {'content': 'c'},
+            {'content': 'd', 'simhash': format(similarity.simhash(OTHER), 'x')},
+        ]
+        self.assertEqual([r['content'] for r in similarity.collapse_duplicates(records)], ['a', 'c', 'd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import importlib.util
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SUMMARY_STORE_PATH = PROJECT_ROOT / 'core' / 'summary_store.py'
+
+spec = importlib.util.spec_from_file_location('core.summary_store', SUMMARY_STORE_PATH)
+summary_store = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summary_store)
+SummaryStore = summary_store.SummaryStore
+
+
+class SummaryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SummaryStore(str(Path(self.tmp.name) / 'entries.jsonl'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_appends_are_all_kept(self):
+        def worker(offset):
+            for i in range(50):
+                self.store.append({'title': f'{offset}-{i}', 'content': 'x' * 200})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        batches = self.store.rotate()
+        titles = {record['title'] for record in self.store.iter_records(batches)}
+        self.assertEqual(len(titles), 200)
+
+    def test_rotation_isolates_consumed_batch(self):
+        self.store.append({'content': 'first'})
+        batches = self.store.rotate()
+        self.store.append({'content': 'second'})
+
+        self.assertEqual([r['content'] for r in self.store.iter_records(batches)], ['first'])
+        self.store.discard(batches)
+        self.assertEqual([r['content'] for r in self.store.iter_records(self.store.rotate())], ['second'])
+
+    def test_unconsumed_batches_are_returned_again(self):
+        self.store.append({'content': 'first'})
+        self.store.rotate()
+        self.store.append({'content': 'second'})
+        batches = self.store.rotate()
+        self.assertEqual([r['content'] for r in self.store.iter_records(batches)], ['first', 'second'])
+
+    def test_import_legacy_json_array(self):
+        legacy = Path(self.tmp.name) / 'entries.json'
+        legacy.write_text(json.dumps([{'content': 'old'}]), encoding='utf8')
+        self.store.import_legacy(str(legacy))
+
+        self.assertFalse(legacy.exists())
+        self.assertEqual([r['content'] for r in self.store.iter_records(self.store.rotate())], ['old'])
+
+
+if __name__ == '__main__':
+    unittest.main()
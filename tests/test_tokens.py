@@ -0,0 +1,36 @@
+import importlib.util
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TOKENS_PATH = PROJECT_ROOT / 'common' / 'tokens.py'
+
+spec = importlib.util.spec_from_file_location('common.tokens', TOKENS_PATH)
+tokens = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(tokens)
+
+
+class TokensTest(unittest.TestCase):
+    def test_estimate_counts_cjk_characters_individually(self):
+        self.assertEqual(tokens.estimate_tokens(''), 0)
+        self.assertEqual(tokens.estimate_tokens('abcdefgh'), 2)
+        self.assertEqual(tokens.estimate_tokens('这是测试'), 4)
+
+    def test_split_by_budget_keeps_order_and_budget(self):
+        texts = ['a' * 40, 'b' * 40, 'c' * 40, 'd' * 200]
+        chunks = tokens.split_by_budget(texts, budget=20)
+        self.assertEqual(chunks, [['a' * 40, 'b' * 40], ['c' * 40], ['d' * 200]])
+
+    def test_truncate_to_budget(self):
+        text = '\n'.join('paragraph %d ' % n + 'x' * 60 for n in range(50))
+        self.assertEqual(tokens.truncate_to_budget(text, None), text)
+        self.assertEqual(tokens.truncate_to_budget('short', 100), 'short')
+
+        truncated = tokens.truncate_to_budget(text, 100)
+        self.assertTrue(truncated.endswith('[…]'))
+        self.assertLessEqual(tokens.estimate_tokens(truncated), 105)
+        self.assertTrue(text.startswith(truncated[:-len('\n\n[…]')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import importlib.util
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+WRITE_BACK_PATH = PROJECT_ROOT / 'core' / 'write_back.py'
+
+spec = importlib.util.spec_from_file_location('core.write_back', WRITE_BACK_PATH)
+write_back = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(write_back)
+WriteBack = write_back.WriteBack
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+
+class FakeClient:
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.updated = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def update_entry(self, entry_id, content):
+        with self.lock:
+            self.calls += 1
+            errors = self.failures.get(entry_id)
+            if errors:
+                raise errors.pop(0)
+            self.updated[entry_id] = content
+
+
+def _wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class WriteBackTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'write_back.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_transient_errors_are_retried(self):
+        client = FakeClient({1: [HTTPError(503), ConnectionError('reset')]})
+        spool = WriteBack(self.path, client, concurrency=2, base_backoff=0.01)
+        spool.start()
+        spool.submit(1, 'content')
+
+        self.assertTrue(_wait_until(lambda: spool.depth() == 0))
+        self.assertEqual(client.updated, {1: 'content'})
+        self.assertEqual(spool.retried, 2)
+
+    def test_permanent_errors_are_dropped(self):
+        client = FakeClient({1: [HTTPError(404)]})
+        spool = WriteBack(self.path, client, concurrency=1, base_backoff=0.01)
+        spool.start()
+        spool.submit(1, 'content')
+
+        self.assertTrue(_wait_until(lambda: spool.depth() == 0))
+        self.assertEqual(client.updated, {})
+        self.assertEqual(spool.dropped, 1)
+
+    def test_spooled_updates_are_replayed_after_restart(self):
+        WriteBack(self.path, FakeClient(), concurrency=1).submit(7, 'saved')
+
+        client = FakeClient()
+        spool = WriteBack(self.path, client, concurrency=1)
+        self.assertEqual(spool.depth(), 1)
+        spool.start()
+        self.assertTrue(_wait_until(lambda: spool.depth() == 0))
+        self.assertEqual(client.updated, {7: 'saved'})
+
+
+if __name__ == '__main__':
+    unittest.main()